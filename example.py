@@ -3,10 +3,12 @@
 Example usage of the flagged-csv library.
 """
 
-from flagged_csv import XlsxConverter, XlsxConverterConfig
-import re
+from flagged_csv import XlsxConverter, XlsxConverterConfig, COLOR_RE, MERGE_RE, scan_flags, strip_flags
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
 
 def main():
     """Demonstrate various features of the flagged-csv library."""
@@ -51,8 +53,8 @@ def main():
     csv_with_formatting = converter.convert_to_csv(
         'financial_report.xlsx',
         tab_name='Q4 Results',
-        include_colors=True,      # Include {{#RRGGBB}} color flags
-        signal_merge=True,        # Include {{MG:XXXXXX}} merge flags
+        include_colors=True,      # Include {#RRGGBB} color flags
+        signal_merge=True,        # Include {MG:XXXXXX} merge flags
         preserve_formats=True,    # Keep $, %, dates as formatted
         ignore_colors='#FFFFFF'   # Ignore white backgrounds
     )
@@ -62,55 +64,63 @@ def main():
     print("=== Example 3: Parsing Flagged CSV ===")
     
     # Sample flagged CSV content
-    sample_flagged_csv = """Revenue{{#00FF00}},$1000{{#00FF00}}{{MG:123456}},{{MG:123456}},Q4 Total
-Expenses{{#FF0000}},$800{{#FF0000}}{{MG:789012}},{{MG:789012}},Q4 Total
-Profit{{#0000FF}},$200{{#0000FF}},,Q4 Total"""
+    sample_flagged_csv = """Revenue{#00FF00},$1000{#00FF00}{MG:123456},{MG:123456},Q4 Total
+Expenses{#FF0000},$800{#FF0000}{MG:789012},{MG:789012},Q4 Total
+Profit{#0000FF},$200{#0000FF},,Q4 Total"""
     
     print("Sample flagged CSV:")
     print(sample_flagged_csv)
     print()
     
-    # Parse the flags
+    # Parse the flags for every cell at once with pandas' vectorized string methods,
+    # keeping the results as parallel arrays: colors and merge IDs as packed integers
     lines = sample_flagged_csv.strip().split('\n')
-    for i, line in enumerate(lines):
-        cells = line.split(',')
-        print(f"\nRow {i + 1}:")
-        
-        for j, cell in enumerate(cells):
-            # Extract color
-            color_match = re.search(r'{{#([0-9A-Fa-f]{6})}}', cell)
-            color = f"#{color_match.group(1)}" if color_match else "No color"
-            
-            # Extract merge ID
-            merge_match = re.search(r'{{MG:(\d{6})}}', cell)
-            merge_id = merge_match.group(1) if merge_match else "Not merged"
-            
-            # Get clean value
-            clean_value = re.sub(r'{{[^}]+}}', '', cell)
-            
-            print(f"  Cell {chr(65+j)}{i+1}: '{clean_value}' | Color: {color} | Merge: {merge_id}")
+    cells = pd.DataFrame([line.split(',') for line in lines]).stack()
+    
+    NO_COLOR = 0xFFFFFFFF  # Outside the 24-bit RGB range
+    values = cells.map(strip_flags).to_numpy(dtype=object)
+    colors = (cells.str.extract(COLOR_RE, expand=False)
+              .map(lambda rgb: int(rgb, 16), na_action='ignore')
+              .fillna(NO_COLOR).to_numpy(dtype=np.uint32))
+    merge_ids = pd.to_numeric(cells.str.extract(MERGE_RE, expand=False)).fillna(0).to_numpy(dtype=np.uint32)
+    
+    for k, (i, j) in enumerate(cells.index):
+        if j == 0:
+            print(f"\nRow {i + 1}:")
+        color = f"#{colors[k]:06X}" if colors[k] != NO_COLOR else 'No color'
+        merge_id = merge_ids[k] or 'Not merged'
+        print(f"  Cell {chr(65+j)}{i+1}: '{values[k]}' | Color: {color} | Merge: {merge_id}")
+    
+    # Locate flags across the whole document in a single scan
+    flags = scan_flags(sample_flagged_csv)
+    color_count = sum(1 for kind, _, _ in flags if kind == 'color')
+    merge_groups = {sample_flagged_csv[start + 4:end - 1] for kind, start, end in flags if kind == 'merge'}
+    print(f"\nFound {color_count} color flags and {len(merge_groups)} merge groups")
     
     # Example 4: Working with multiple sheets
     print("\n=== Example 4: Multiple Sheets ===")
     print("""
-    # Process all sheets in a workbook:
-    
-    import pandas as pd
-    
-    xl_file = pd.ExcelFile('multi_sheet_workbook.xlsx')
-    for sheet_name in xl_file.sheet_names:
-        csv_content = converter.convert_to_csv(
-            'multi_sheet_workbook.xlsx',
-            tab_name=sheet_name,
-            include_colors=True,
-            signal_merge=True
-        )
-        
-        # Save each sheet to a separate CSV
-        output_file = f'{sheet_name.replace(" ", "_")}.csv'
-        with open(output_file, 'w') as f:
-            f.write(csv_content)
-        print(f'Converted {sheet_name} -> {output_file}')
+    # Process all sheets in a workbook, opening it only once:
+    
+    from openpyxl import load_workbook
+    
+    wb = load_workbook('multi_sheet_workbook.xlsx', read_only=True, data_only=True)
+    try:
+        for sheet_name in wb.sheetnames:
+            csv_content = converter.convert_to_csv(
+                wb,
+                tab_name=sheet_name,
+                include_colors=True,
+                signal_merge=True
+            )
+            
+            # Save each sheet to a separate CSV
+            output_file = f'{sheet_name.replace(" ", "_")}.csv'
+            with open(output_file, 'w') as f:
+                f.write(csv_content)
+            print(f'Converted {sheet_name} -> {output_file}')
+    finally:
+        wb.close()
     """)
     
     # Example 5: Different output formats
@@ -2,8 +2,8 @@
 Flagged CSV - Convert XLSX files to CSV with visual formatting preserved as inline flags.
 
 This library allows you to convert Excel files to CSV while preserving:
-- Cell background colors as {{#RRGGBB}} flags
-- Merged cell information as {{MG:XXXXXX}} flags
+- Cell background colors as {#RRGGBB} flags
+- Merged cell information as {MG:XXXXXX} flags
 - Cell formatting (currency, dates, etc.)
 
 Example:
@@ -18,8 +18,39 @@ Example:
     )
 """
 
-from .converter import XlsxConverter, XlsxConverterConfig
-from .formatter import ExcelFormatter
+import importlib
+from typing import TYPE_CHECKING
+
+from .parser import COLOR_RE, MERGE_RE, FLAG_RE, FLAGS_RE, parse_cell, scan_flags, strip_flags
+
+if TYPE_CHECKING:
+    from .converter import XlsxConverter, XlsxConverterConfig
+    from .formatter import ExcelFormatter
 
 __version__ = "0.1.0"
-__all__ = ["XlsxConverter", "XlsxConverterConfig", "ExcelFormatter"]
\ No newline at end of file
+__all__ = [
+    "XlsxConverter", "XlsxConverterConfig", "ExcelFormatter",
+    "COLOR_RE", "MERGE_RE", "FLAG_RE", "FLAGS_RE", "parse_cell",
+    "scan_flags", "strip_flags",
+]
+
+# The converter and formatter pull in pandas and openpyxl, so they are only
+# imported on first access (PEP 562); the flag parsing helpers stay cheap
+_LAZY_ATTRS = {
+    "XlsxConverter": "converter",
+    "XlsxConverterConfig": "converter",
+    "ExcelFormatter": "formatter",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
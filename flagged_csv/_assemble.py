@@ -0,0 +1,203 @@
+"""
+Specialized row assemblers for the formatting-aware conversion path.
+
+Which flags a cell can carry depends on a handful of options that are fixed
+for a whole conversion, so rather than testing every option for every cell,
+the per-row loop is generated once per combination of options with only the
+steps that apply, and compiled with exec.
+"""
+
+import sys
+from functools import lru_cache
+from itertools import chain
+from typing import Callable, Dict, List, Optional, Tuple
+
+from openpyxl.utils import get_column_letter
+
+from .formatter import ExcelFormatter
+
+
+_HEADER = '''\
+def assemble_row(row_idx, values, formats, bg_colors, fg_colors, merge_row, bg_flags, fg_flags, black_fg_flags, merge_flags, location_prefixes):
+    row_data = [None] * len(values)
+'''
+
+_LOCATION_ROW = '''\
+    location_suffix = str(row_idx) + '}'
+'''
+
+_LOOP = '''\
+    for col_idx, value in enumerate(values):
+        flags = ''
+'''
+
+_FORMAT = '''\
+        if value is not None:
+            number_format = formats[col_idx]
+            # None for General, text and other formats that leave str(value) as is
+            format_fn = formatter_for(number_format)
+            if format_fn is not None:
+                try:
+                    value = format_fn(value, number_format)
+                except:
+                    pass
+'''
+
+_BG_COLOR = '''\
+        bg_color_hex = bg_colors[col_idx]
+        has_background = bg_color_hex in bg_flags
+        if has_background:
+            flags += bg_flags[bg_color_hex]
+'''
+
+_FG_COLOR = '''\
+        if value is not None:
+            fg_color_hex = fg_colors[col_idx]
+            if fg_color_hex in fg_flags:
+                flags += fg_flags[fg_color_hex]
+            # Only include black foreground color if there's also a background color (for contrast)
+            elif fg_color_hex in black_fg_flags and {black_needs_background}:
+                flags += black_fg_flags[fg_color_hex]
+'''
+
+_MERGE = '''\
+        if merge_row is not None:
+            flags += merge_flags[merge_row[col_idx]]
+'''
+
+_LOCATION = '''\
+        if value is not None or flags:
+            flags += location_prefixes[col_idx] + location_suffix
+'''
+
+_FOOTER = '''\
+        if value is not None:
+            row_data[col_idx] = str(value) + flags
+        elif flags:
+            row_data[col_idx] = flags
+    return row_data
+'''
+
+
+# Bits of the options mask that selects a row assembler
+OPT_BG = 1
+OPT_FG = 2
+OPT_MERGE = 4
+OPT_FMT = 8
+OPT_LOC = 16
+
+
+def option_bits(
+    include_bg_colors: bool,
+    include_fg_colors: bool,
+    signal_merge: bool,
+    preserve_formats: bool,
+    add_location: bool
+) -> int:
+    """Pack the flag options of a conversion into an OPT_* bitmask."""
+    return (
+        (OPT_BG if include_bg_colors else 0)
+        | (OPT_FG if include_fg_colors else 0)
+        | (OPT_MERGE if signal_merge else 0)
+        | (OPT_FMT if preserve_formats else 0)
+        | (OPT_LOC if add_location else 0)
+    )
+
+
+@lru_cache(maxsize=None)
+def build_row_assembler(options: int) -> Callable[..., List[Optional[str]]]:
+    """
+    Return a function that turns one row of raw cells into flagged cell strings.
+
+    options is an OPT_* bitmask from option_bits(); one function is compiled
+    and cached per distinct mask.
+
+    The returned function is called as assemble_row(row_idx, values, formats,
+    bg_colors, fg_colors, merge_row, bg_flags, fg_flags, black_fg_flags,
+    merge_flags), where row_idx is the 1-based Excel row number, the list
+    arguments are that row's slices of the SheetData grids and merge_row holds
+    the row's merge IDs (0 when not merged) or None. The flag dicts come from
+    color_flags() and map merge IDs to their flags, and location_prefixes is
+    location_prefixes() for the row width (or None without OPT_LOC). Empty
+    cells without flags come back as None.
+    """
+    parts = [_HEADER]
+    if options & OPT_LOC:
+        parts.append(_LOCATION_ROW)
+    parts.append(_LOOP)
+    if options & OPT_FMT:
+        parts.append(_FORMAT)
+    if options & OPT_BG:
+        parts.append(_BG_COLOR)
+    if options & OPT_FG:
+        # Without background flags, black text is kept when the cell has any fill at all
+        black_needs_background = 'has_background' if options & OPT_BG else 'bg_colors[col_idx] is not None'
+        parts.append(_FG_COLOR.format(black_needs_background=black_needs_background))
+    if options & OPT_MERGE:
+        parts.append(_MERGE)
+    if options & OPT_LOC:
+        parts.append(_LOCATION)
+    parts.append(_FOOTER)
+
+    namespace: dict = {'formatter_for': ExcelFormatter.formatter_for}
+    exec(compile(''.join(parts), '<flagged_csv row assembler>', 'exec'), namespace)
+    return namespace['assemble_row']
+
+
+@lru_cache(maxsize=None)
+def column_letters(count: int) -> Tuple[str, ...]:
+    """Return the letters of the first count columns (A, B, ...)."""
+    return tuple(get_column_letter(i) for i in range(1, count + 1))
+
+
+@lru_cache(maxsize=None)
+def location_prefixes(count: int) -> Tuple[str, ...]:
+    """Return the '{l:<column>' start of the location flag for the first count columns."""
+    return tuple(sys.intern('{l:' + letter) for letter in column_letters(count))
+
+
+def color_flags(
+    bg_colors: List[List[Optional[str]]],
+    fg_colors: List[List[Optional[str]]],
+    bg_ignore_list: set,
+    fg_ignore_list: set
+) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, str]]:
+    """
+    Build the flag string for every distinct color of a sheet, once.
+
+    Ignored colors are left out, so the row loop only needs a dict lookup per
+    cell. The flags are interned, so cells sharing a color share one string.
+
+    Returns:
+        Tuple of (bg_flags, fg_flags, black_fg_flags). black_fg_flags holds
+        black text colors, which are only flagged on cells with a background.
+    """
+    bg_flags = {}
+    for color in _distinct_colors(bg_colors):
+        if _ignore_key(color) not in bg_ignore_list:
+            # Use backward-compatible {#RRGGBB} format by default
+            bg_flags[color] = sys.intern('{' + color + '}')
+
+    fg_flags = {}
+    black_fg_flags = {}
+    for color in _distinct_colors(fg_colors):
+        key = _ignore_key(color)
+        if key not in fg_ignore_list:
+            target = black_fg_flags if key == '000000' else fg_flags
+            target[color] = sys.intern('{fc:' + color + '}')
+
+    return bg_flags, fg_flags, black_fg_flags
+
+
+def _distinct_colors(grid: List[List[Optional[str]]]) -> set:
+    """Collect the distinct non-empty colors of a grid."""
+    # set() consumes the chained rows in C, without a Python-level test per cell
+    colors = set(chain.from_iterable(grid))
+    colors.discard(None)
+    colors.discard('')
+    return colors
+
+
+def _ignore_key(color: str) -> str:
+    """Normalize a color the way ignore lists are written (uppercase hex, no #)."""
+    return (color[1:] if color.startswith('#') else color).upper()
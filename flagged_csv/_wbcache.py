@@ -0,0 +1,80 @@
+"""
+On-disk cache of parsed sheets, so repeated conversions skip openpyxl.
+
+Entries are pickles keyed by the workbook's path, modification time and size
+plus the read options, so editing the file invalidates them automatically.
+Only the newest MAX_ENTRIES entries are kept. Only point the cache at a
+directory you own: entries are unpickled on load.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+
+# Bump when the cached data layout changes so stale entries are ignored
+CACHE_VERSION = 1
+
+# Entries kept per cache directory; every edit of a workbook or new option
+# combination adds one, so the oldest are pruned when an entry is stored
+MAX_ENTRIES = 256
+
+
+def default_cache_dir() -> str:
+    """Return the per-user cache directory ($XDG_CACHE_HOME/flagged-csv)."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(Path.home(), '.cache')
+    return os.path.join(base, 'flagged-csv')
+
+
+def cache_key(file_path: str, sheet_name: str, *options: Any) -> str:
+    """Build the cache key for a sheet of a workbook read with the given options."""
+    path = os.path.abspath(file_path)
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((CACHE_VERSION, path, stat.st_mtime_ns, stat.st_size, sheet_name, options)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def load(cache_dir: str, key: str) -> Optional[Any]:
+    """Return the cached entry for key, or None on a miss or unreadable entry."""
+    try:
+        with open(os.path.join(cache_dir, f"{key}.pkl"), 'rb') as fh:
+            return pickle.load(fh)
+    except Exception:
+        return None
+
+
+def store(cache_dir: str, key: str, value: Any) -> None:
+    """Write an entry to the cache; failures are ignored since caching is best-effort."""
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, os.path.join(cache_dir, f"{key}.pkl"))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        _prune(cache_dir)
+    except Exception:
+        pass
+
+
+def _prune(cache_dir: str) -> None:
+    """Delete the least recently written entries beyond MAX_ENTRIES."""
+    with os.scandir(cache_dir) as it:
+        entries = [entry for entry in it if entry.name.endswith('.pkl')]
+    if len(entries) <= MAX_ENTRIES:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+    for entry in entries[:-MAX_ENTRIES]:
+        try:
+            os.unlink(entry.path)
+        except OSError:
+            # Already removed, e.g. by a concurrent prune
+            pass
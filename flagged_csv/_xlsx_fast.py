@@ -0,0 +1,290 @@
+"""
+Single-pass reader for openpyxl read-only worksheets.
+
+openpyxl's read-only iter_rows() wraps every cell in a ReadOnlyCell and stops
+at max_row, so merged ranges (stored after the cell data) need a second parse
+of the sheet XML. This walks the XML once instead, collecting <mergeCell>
+refs on the way. Plain numbers and strings are decoded inline; anything
+needing more care (formulas, dates, rich text, errors) goes through
+openpyxl's own WorkSheetParser so the values stay identical.
+
+open_workbook() loads a workbook like openpyxl.load_workbook, optionally
+reusing a shared string table read by an earlier load of the same file.
+"""
+
+import re
+import zipfile
+from typing import Any, List, Optional, Tuple
+
+from openpyxl.reader.excel import ExcelReader, _find_workbook_part
+from openpyxl.reader.workbook import WorkbookParser
+from openpyxl.utils import column_index_from_string, range_boundaries
+from openpyxl.worksheet._reader import (
+    FORMULA_TAG, INLINE_STRING, ROW_TAG, VALUE_TAG, WorkSheetParser, _cast_number
+)
+from openpyxl.xml.constants import SHARED_STRINGS, SHEET_MAIN_NS
+from openpyxl.xml.functions import iterparse
+
+
+MERGE_CELL_TAG = f'{{{SHEET_MAIN_NS}}}mergeCell'
+TEXT_TAG = f'{{{SHEET_MAIN_NS}}}t'
+
+_DIGITS = '0123456789'
+
+# A text element holding only whitespace, without xml:space="preserve";
+# python-calamine reads these as '' while openpyxl keeps the whitespace
+_BLANK_TEXT_RE = re.compile(rb'<(?:\w+:)?t>\s+</(?:\w+:)?t>')
+# Bytes of an archive member scanned at a time
+_SCAN_CHUNK_SIZE = 1 << 20
+
+
+class _ExcelReader(ExcelReader):
+    """ExcelReader that takes its shared strings from a previous read when given them."""
+    
+    def __init__(self, *args, shared_strings: Optional[list] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._reused_strings = shared_strings
+    
+    def read_strings(self):
+        if self._reused_strings is None:
+            super().read_strings()
+        else:
+            self.shared_strings = self._reused_strings
+
+
+def open_workbook(file_path, read_only: bool, data_only: bool, shared_strings: Optional[list] = None):
+    """
+    Load a workbook like openpyxl.load_workbook(keep_links=False).
+    
+    Args:
+        file_path: Path to the workbook
+        read_only: Open the workbook in read-only (streaming) mode
+        data_only: Read cached formula results instead of formulas
+        shared_strings: Shared string table of an earlier load of the same
+            file to reuse instead of parsing xl/sharedStrings.xml again
+    
+    Returns:
+        Tuple of (workbook, shared_strings), the latter to pass to later
+        loads of the unchanged file. The table is only read, never modified.
+    """
+    reader = _ExcelReader(file_path, read_only, False, data_only, False, shared_strings=shared_strings)
+    reader.read()
+    return reader.wb, reader.shared_strings
+
+
+def has_unpreserved_blank_text(file_path, sheet_name: str) -> bool:
+    """
+    Whether a sheet's strings include whitespace-only text python-calamine would drop.
+    
+    Excel marks such text xml:space="preserve", but openpyxl and some other
+    writers don't, and calamine then trims it to an empty cell. Only the
+    shared strings and the sheet's own XML are scanned, streamed in chunks
+    up to the first match; the whole sheet is read when there is none, even
+    past max_rows.
+    
+    Args:
+        file_path: Path to the workbook
+        sheet_name: Name of the sheet to check
+    
+    Returns:
+        True if the sheet may hold such text; False otherwise, including
+        for files that are not xlsx archives or lack the sheet
+    """
+    try:
+        reader = ExcelReader(file_path, read_only=True, keep_links=False)
+    except (zipfile.BadZipFile, OSError):
+        return False
+    try:
+        reader.read_manifest()
+        parser = WorkbookParser(reader.archive, _find_workbook_part(reader.package).PartName[1:], keep_links=False)
+        parser.parse()
+        parts = [rel.target for sheet, rel in parser.find_sheets() if sheet.name == sheet_name]
+        if not parts:
+            return False
+        strings = reader.package.find(SHARED_STRINGS)
+        if strings is not None:
+            parts.append(strings.PartName[1:])
+        for part in parts:
+            if part in reader.valid_files:
+                with reader.archive.open(part) as src:
+                    if _stream_contains(src, _BLANK_TEXT_RE):
+                        return True
+        return False
+    finally:
+        reader.archive.close()
+
+
+def _stream_contains(src, pattern) -> bool:
+    """Search a binary XML stream chunk by chunk, stopping at the first match."""
+    carry = b''
+    while True:
+        chunk = src.read(_SCAN_CHUNK_SIZE)
+        if not chunk:
+            return False
+        data = carry + chunk
+        if pattern.search(data):
+            return True
+        # A match cut off by the chunk end starts at the last opening tag
+        # (a '<' at the very end may still turn out to close one), so
+        # everything from there is searched again with the next chunk
+        start = len(data)
+        while True:
+            prev = data.rfind(b'<', 0, start)
+            if prev < 0:
+                break
+            start = prev
+            if data[start + 1:start + 2] not in (b'/', b''):
+                break
+        carry = data[start:]
+
+
+def read_sheet(
+    ws, max_rows: int, max_columns: int
+) -> Tuple[List[List[Any]], List[List[Optional[int]]], List[Tuple[int, int, int, int]]]:
+    """
+    Read the values, style ids and merged ranges of a read-only worksheet.
+
+    The value grid matches ws.iter_rows(max_row=max_rows, max_col=max_columns,
+    values_only=True): every row is max_columns wide and missing rows are
+    filled in. Rows past max_rows and cells past max_columns are skipped
+    without being decoded.
+
+    Args:
+        ws: openpyxl ReadOnlyWorksheet
+        max_rows: Maximum number of rows to read
+        max_columns: Maximum number of columns to read
+
+    Returns:
+        Tuple of (values, style_ids, merged_ranges). style_ids holds the
+        workbook cell style index of each cell, or None where the sheet has
+        no cell; merged_ranges holds (min_row, min_col, max_row, max_col).
+    """
+    wb = ws.parent
+    values = []
+    style_ids = []
+    merged_ranges = []
+    empty_values = [None] * max_columns
+    counter = 1
+    truncated = False
+
+    with ws._get_source() as source:
+        parser = WorkSheetParser(
+            source, ws._shared_strings,
+            data_only=wb.data_only,
+            epoch=wb.epoch,
+            date_formats=wb._date_formats,
+            timedelta_formats=wb._timedelta_formats
+        )
+
+        for _, element in iterparse(source):
+            tag = element.tag
+            if tag == ROW_TAG:
+                row_number = element.get('r')
+                if row_number is not None:
+                    parser.row_counter = int(float(row_number))
+                else:
+                    parser.row_counter += 1
+                idx = parser.row_counter
+                if truncated or idx > max_rows:
+                    truncated = True
+                    element.clear()
+                    continue
+
+                cells = _parse_cells(parser, element, max_columns)
+                element.clear()
+
+                # Some rows are missing from the XML
+                while counter < idx:
+                    values.append(list(empty_values))
+                    style_ids.append(list(empty_values))
+                    counter += 1
+
+                if counter == idx:
+                    row_values = list(empty_values)
+                    row_styles = list(empty_values)
+                    for column, value, style_id in cells:
+                        row_values[column - 1] = value
+                        row_styles[column - 1] = style_id
+                    values.append(row_values)
+                    style_ids.append(row_styles)
+                    counter += 1
+
+            elif tag == MERGE_CELL_TAG:
+                min_col, min_row, max_col, max_row = range_boundaries(element.get('ref'))
+                merged_ranges.append((min_row, min_col, max_row, max_col))
+                element.clear()
+
+    # iter_rows pads up to max_row when the sheet continues past it
+    if truncated:
+        while counter <= max_rows:
+            values.append(list(empty_values))
+            style_ids.append(list(empty_values))
+            counter += 1
+
+    return values, style_ids, merged_ranges
+
+
+def _parse_cells(parser: WorkSheetParser, row, max_columns: int) -> List[Tuple[int, Any, int]]:
+    """Decode the cells of a <row> element up to column max_columns as (column, value, style_id)."""
+    shared_strings = parser.shared_strings
+    date_formats = parser.date_formats
+    check_formulas = not parser.data_only
+    column = 0
+    cells = []
+    add_cell = cells.append
+    for element in row:
+        coordinate = element.get('r')
+        if coordinate:
+            # The row number is already known, only the column letters matter
+            column = column_index_from_string(coordinate.rstrip(_DIGITS))
+        else:
+            column += 1
+        # Cells are stored in column order, so the rest of the row is out of bounds too
+        if column > max_columns:
+            break
+
+        style_id = element.get('s')
+        style_id = int(style_id) if style_id else 0
+        data_type = element.get('t', 'n')
+
+        if check_formulas and element.find(FORMULA_TAG) is not None:
+            value = _parse_cell_slow(parser, element, column)
+        elif data_type == 'n':
+            value = element.findtext(VALUE_TAG) or None
+            if value is not None:
+                if style_id in date_formats:
+                    value = _parse_cell_slow(parser, element, column)
+                else:
+                    value = _cast_number(value)
+        elif data_type == 's':
+            value = element.findtext(VALUE_TAG) or None
+            if value is not None:
+                value = shared_strings[int(value)]
+        elif data_type == 'str':
+            value = element.findtext(VALUE_TAG) or None
+        elif data_type == 'inlineStr' and not parser.rich_text:
+            value = _inline_text(element)
+            if value is None:
+                value = _parse_cell_slow(parser, element, column)
+        else:
+            value = _parse_cell_slow(parser, element, column)
+
+        add_cell((column, value, style_id))
+    return cells
+
+
+def _inline_text(element) -> Optional[str]:
+    """Return the text of an unformatted inline string, or None if it needs the full parser."""
+    inline = element.find(INLINE_STRING)
+    if inline is None or len(inline) != 1:
+        return None
+    text = inline[0]
+    if text.tag != TEXT_TAG:
+        return None
+    return text.text or ''
+
+
+def _parse_cell_slow(parser: WorkSheetParser, element, column: int) -> Any:
+    """Decode a cell with openpyxl's parser (formulas, dates, rich text, errors)."""
+    parser.col_counter = column - 1
+    return parser.parse_cell(element)['value']
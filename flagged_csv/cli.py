@@ -2,15 +2,46 @@
 Command-line interface for flagged-csv converter.
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import click
-from pathlib import Path
-from .converter import XlsxConverter, XlsxConverterConfig
+from ._wbcache import default_cache_dir
+
+
+# Write buffer for output files, so large sheets reach the disk in few syscalls
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+
+def _convert_one(input_file, sheet, config_dict, options):
+    """Convert a single sheet; top-level so it can run in a worker process."""
+    from .converter import XlsxConverter, XlsxConverterConfig
+    
+    converter = XlsxConverter(XlsxConverterConfig(**config_dict))
+    return sheet, converter.convert_to_csv(input_file, tab_name=sheet, **options)
+
+
+def _resolve_sheets(input_file, sheets):
+    """Expand a --sheets value ('*' or a comma-separated list) into sheet names."""
+    if sheets.strip() == '*':
+        from openpyxl import load_workbook
+        
+        wb = load_workbook(input_file, read_only=True)
+        try:
+            return list(wb.sheetnames)
+        finally:
+            wb.close()
+    return [name.strip() for name in sheets.split(',') if name.strip()]
 
 
 @click.command()
 @click.argument('input_file', type=click.Path(exists=True))
-@click.option('-t', '--tab-name', required=True, help='Sheet/tab name to convert')
-@click.option('-o', '--output', type=click.Path(), help='Output file (default: stdout)')
+@click.option('-t', '--tab-name', help='Sheet/tab name to convert')
+@click.option('--sheets', help='Convert several sheets: comma-separated names or "*" for all')
+@click.option('-j', '--jobs', type=click.IntRange(min=1), default=None,
+              help='Worker processes for --sheets (default: CPU count)')
+@click.option('-o', '--output', type=click.Path(),
+              help='Output file (default: stdout); use {sheet} in the name with --sheets')
 @click.option('--format', type=click.Choice(['csv', 'html', 'markdown']), default='csv', 
               help='Output format (default: csv)')
 @click.option('--include-colors', is_flag=True, help='Include both foreground and background colors')
@@ -27,10 +58,13 @@ from .converter import XlsxConverter, XlsxConverterConfig
 @click.option('--max-columns', type=int, default=100, help='Maximum columns to process (default: 100)')
 @click.option('--no-header', is_flag=True, help='Exclude header row from output')
 @click.option('--keep-na', is_flag=True, help='Keep NA values instead of converting to empty strings')
-def main(input_file, tab_name, output, format, include_colors, include_bg_colors,
+@click.option('--cache', is_flag=True, help='Cache parsed sheets in $XDG_CACHE_HOME/flagged-csv between runs')
+@click.option('--no-read-only', is_flag=True, help="Load the full workbook instead of streaming it in openpyxl's read-only mode")
+def main(input_file, tab_name, sheets, jobs, output, format, include_colors, include_bg_colors,
          include_fg_colors, signal_merge, preserve_formats, ignore_colors, 
          ignore_bg_colors, ignore_fg_colors, keep_empty_lines, add_location, 
-         max_rows, max_columns, no_header, keep_na):
+         max_rows, max_columns, no_header, keep_na, cache,
+         no_read_only):
     """
     Convert XLSX files to CSV with visual formatting preserved as inline flags.
     
@@ -47,21 +81,29 @@ def main(input_file, tab_name, output, format, include_colors, include_bg_colors
         
         # Ignore white background
         flagged-csv data.xlsx -t Sheet1 --include-colors --ignore-colors "#FFFFFF"
+        
+        # Convert every sheet in parallel, one file per sheet
+        flagged-csv data.xlsx --sheets "*" -o "{sheet}.csv"
     """
+    if not tab_name and not sheets:
+        raise click.UsageError("Either -t/--tab-name or --sheets is required")
+    if tab_name and sheets:
+        raise click.UsageError("-t/--tab-name and --sheets are mutually exclusive")
+    
+    # Imported only now so --help and usage errors don't load pandas and openpyxl
+    from .converter import XlsxConverter, XlsxConverterConfig
+    
     try:
         # Create converter with config
         config = XlsxConverterConfig(
             header=not no_header,
             keep_default_na=keep_na,
             keep_empty_lines=keep_empty_lines,
-            add_location=add_location
+            add_location=add_location,
+            read_only=not no_read_only,
+            cache_dir=default_cache_dir() if cache else None
         )
-        converter = XlsxConverter(config)
-        
-        # Convert the file
-        result = converter.convert_to_csv(
-            input_file,
-            tab_name=tab_name,
+        options = dict(
             output_format=format,
             include_colors=include_colors,
             include_bg_colors=include_bg_colors,
@@ -77,13 +119,25 @@ def main(input_file, tab_name, output, format, include_colors, include_bg_colors
             max_columns=max_columns
         )
         
-        # Output result
+        if sheets:
+            _convert_sheets(input_file, _resolve_sheets(input_file, sheets), config, options, output, jobs)
+            return
+        
+        converter = XlsxConverter(config)
+        
+        # Output result, streaming it rather than building one string; the
+        # sheet is read first, so a failed conversion leaves -o untouched
+        chunks = converter.convert_to_csv_iter(input_file, tab_name=tab_name, **options)
         if output:
-            Path(output).write_text(result, encoding='utf-8')
+            with open(output, 'w', encoding='utf-8', newline='', buffering=OUTPUT_BUFFER_SIZE) as fh:
+                fh.writelines(chunks)
             click.echo(f"Converted to {output}")
         else:
-            click.echo(result, nl=False)
+            for chunk in chunks:
+                click.echo(chunk, nl=False)
             
+    except click.UsageError:
+        raise
     except FileNotFoundError as e:
         click.echo(f"Error: {e}", err=True)
         raise click.Abort()
@@ -95,5 +149,36 @@ def main(input_file, tab_name, output, format, include_colors, include_bg_colors
         raise click.Abort()
 
 
+def _convert_sheets(input_file, sheet_names, config, options, output, jobs):
+    """Convert several sheets, fanning out across worker processes."""
+    if not output or (len(sheet_names) > 1 and '{sheet}' not in output):
+        raise click.UsageError("--sheets requires -o with a {sheet} placeholder, e.g. -o '{sheet}.csv'")
+    
+    config_dict = config.model_dump()
+    jobs = jobs or os.cpu_count() or 1
+    
+    if jobs == 1 or len(sheet_names) == 1:
+        for sheet in sheet_names:
+            _write_sheet_output(output, *_convert_one(input_file, sheet, config_dict, options))
+        return
+    
+    with ProcessPoolExecutor(max_workers=min(jobs, len(sheet_names))) as pool:
+        futures = [
+            pool.submit(_convert_one, input_file, sheet, config_dict, options)
+            for sheet in sheet_names
+        ]
+        for future in futures:
+            sheet, result = future.result()
+            _write_sheet_output(output, sheet, result)
+
+
+def _write_sheet_output(output, sheet, result):
+    """Write one converted sheet to the path built from the output template."""
+    output_path = output.replace('{sheet}', sheet)
+    with open(output_path, 'w', encoding='utf-8', newline='', buffering=OUTPUT_BUFFER_SIZE) as fh:
+        fh.write(result)
+    click.echo(f"Converted {sheet} -> {output_path}")
+
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
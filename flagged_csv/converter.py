@@ -2,20 +2,79 @@
 Main XLSX to Flagged CSV converter implementation.
 """
 
-from typing import Optional, Literal, Dict, Any
+from typing import Optional, Literal, Dict, Any, BinaryIO, Iterable, Iterator, List, NamedTuple, TextIO, Tuple, Union
+from functools import lru_cache
+from itertools import chain, repeat
+import csv
+import io
+import os
 from pathlib import Path
-import random
+import sys
 import warnings
 import colorsys
 import zipfile
-import xml.etree.ElementTree as etree
+from datetime import date, timedelta
 
+import numpy as np
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell.read_only import ReadOnlyCell
+from openpyxl.worksheet._read_only import ReadOnlyWorksheet
+from openpyxl.xml.functions import fromstring as parse_xml
+from pandas.io.parsers import TextParser
 from pydantic import BaseModel, Field
+from python_calamine import CalamineWorkbook, WorksheetNotFound
 
-from .formatter import ExcelFormatter
+from . import _assemble, _wbcache, _xlsx_fast
+
+
+# Number of rows rendered per chunk when streaming CSV output
+CSV_CHUNK_ROWS = 1000
+
+# DataFrame.attrs key marking frames whose cells are all str or None
+TEXT_CELLS_ATTR = 'flagged_csv_text_cells'
+
+# Theme color slots of theme1.xml's <a:clrScheme>, keyed by tag, as indexed by openpyxl colors
+_DRAWINGML_NS = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+_THEME_COLOR_INDEX = {
+    f'{{{_DRAWINGML_NS}}}{name}': idx
+    for idx, name in enumerate((
+        'lt1', 'dk1', 'lt2', 'dk2', 'accent1', 'accent2', 'accent3',
+        'accent4', 'accent5', 'accent6', 'hlink', 'folHlink'
+    ))
+}
+_CLR_SCHEME_PATH = f'.//{{{_DRAWINGML_NS}}}clrScheme'
+_SRGB_CLR_PATH = f'.//{{{_DRAWINGML_NS}}}srgbClr'
+_SYS_CLR_PATH = f'.//{{{_DRAWINGML_NS}}}sysClr'
+
+# Used when a workbook has no readable theme
+_DEFAULT_THEME_COLORS = {
+    0: "FFFFFF", 1: "000000", 2: "E7E6E6", 3: "44546A",
+    4: "5B9BD5", 5: "ED7D31", 6: "A5A5A5", 7: "FFC000",
+    8: "4472C4", 9: "70AD47"
+}
+
+# Merge IDs run from MERGE_ID_BASE through MERGE_ID_BASE + MERGE_ID_SPAN - 1 (100000-999999)
+MERGE_ID_BASE = 100000
+MERGE_ID_SPAN = 900000
+
+# Number of workbooks (theme colors, resolved styles) and parsed sheets a converter keeps
+STYLE_CACHE_SIZE = 32
+
+
+class SheetData(NamedTuple):
+    """Raw cell grid of a sheet, before any flags are applied.
+    
+    All grids are row-major lists of lists covering the processed area.
+    Color grids hold '#RRGGBB' strings (or None); the format and color grids
+    are empty when those were not requested.
+    """
+    
+    values: List[List[Any]]
+    number_formats: List[List[Optional[str]]]
+    bg_colors: List[List[Optional[str]]]
+    fg_colors: List[List[Optional[str]]]
+    merged_ranges: List[Tuple[int, int, int, int]]
 
 
 class XlsxConverterConfig(BaseModel):
@@ -41,6 +100,152 @@ class XlsxConverterConfig(BaseModel):
         default=False,
         description="Whether to add location coordinates {l:A5} to non-empty cells"
     )
+    read_only: bool = Field(
+        default=True,
+        description="Whether to open workbooks in openpyxl's streaming read-only mode"
+    )
+    data_only: bool = Field(
+        default=True,
+        description="Whether to read cached formula results instead of formulas"
+    )
+    cache_dir: Optional[str] = Field(
+        default=None,
+        description="Directory for caching parsed sheets between runs (disabled when None)"
+    )
+    engine: Literal['calamine', 'openpyxl'] = Field(
+        default='calamine',
+        description="Engine for reading plain values; formatting options always use openpyxl"
+    )
+
+
+_HEX_DIGITS = '0123456789ABCDEFabcdef'
+# str.translate table deleting every ASCII character that is not a hex digit
+_STRIP_NON_HEX = str.maketrans('', '', ''.join(chr(c) for c in range(128) if chr(c) not in _HEX_DIGITS))
+
+# Set once openpyxl's RGB descriptor has been patched by a converter
+_OPENPYXL_PATCHED = False
+
+
+@lru_cache(maxsize=1024)
+def _sanitize_rgb(value: str) -> str:
+    """Reduce a color string to hex digits and pad or cut it to ARGB length."""
+    value = value.translate(_STRIP_NON_HEX)
+    # The table only covers ASCII, which is all a real color string contains
+    if not value.isascii():
+        value = ''.join(c for c in value if c in _HEX_DIGITS)
+    if len(value) == 6:
+        value = 'FF' + value
+    elif len(value) < 6:
+        value = value.ljust(8, '0')
+    elif len(value) > 8:
+        value = value[:8]
+    return value
+
+
+@lru_cache(maxsize=256)
+def _tint_rgb(rgb_hex: str, tint: float) -> str:
+    """Lighten or darken a color by tint in HLS space.
+    
+    Workbooks only use a handful of (theme color, tint) pairs, so the colorsys
+    round trip is shared by every cell and converter that repeats one.
+    """
+    # Convert hex to RGB
+    r = int(rgb_hex[0:2], 16) / 255.0
+    g = int(rgb_hex[2:4], 16) / 255.0
+    b = int(rgb_hex[4:6], 16) / 255.0
+    
+    # Convert to HSL
+    h, l, s = colorsys.rgb_to_hls(r, g, b)
+    
+    # Apply tint
+    if tint < 0:
+        l = l * (1 + tint)  # Make darker
+    else:
+        l = l + (1 - l) * tint  # Make lighter
+    
+    # Convert back to RGB
+    r, g, b = colorsys.hls_to_rgb(h, l, s)
+    
+    return f"{int(r * 255):02X}{int(g * 255):02X}{int(b * 255):02X}"
+
+
+def _text_csv_writer(stream: TextIO):
+    """Return a csv.writer producing the same dialect as DataFrame.to_csv's defaults."""
+    return csv.writer(stream, lineterminator=os.linesep)
+
+
+def _has_text(cells: Iterable[Any]) -> bool:
+    """Return True if any cell is neither NaN nor an empty or whitespace-only string."""
+    for value in cells:
+        if isinstance(value, str):
+            if value.strip():
+                return True
+        elif pd.notna(value) and str(value).strip() != '':
+            return True
+    return False
+
+
+# dtype kinds whose non-missing values never render as blank text
+_NON_TEXT_KINDS = 'biufcmM'
+
+
+def _rows_with_content(df: pd.DataFrame) -> np.ndarray:
+    """Return a boolean array marking the rows of df that hold any non-empty cell.
+    
+    Numeric, boolean and datetime columns only need a vectorized notna();
+    object columns are scanned row by row with _has_text(), and only for
+    the rows the other columns left undecided.
+    """
+    non_text = np.array([dtype.kind in _NON_TEXT_KINDS for dtype in df.dtypes], dtype=bool)
+    has_content = np.zeros(len(df), dtype=bool)
+    if non_text.any():
+        has_content |= df.iloc[:, non_text].notna().to_numpy().any(axis=1)
+    if not non_text.all():
+        text_values = (df.iloc[:, ~non_text] if non_text.any() else df).to_numpy(dtype=object)
+        undecided = np.flatnonzero(~has_content)
+        has_content[undecided] = [_has_text(text_values[idx]) for idx in undecided]
+    return has_content
+
+
+def _content_width(
+    values: List[List[Any]],
+    bg_rows: Iterable[Optional[List[Optional[str]]]],
+    merge_rows: Iterable[Optional[List[int]]],
+    bg_flags: Dict[str, str]
+) -> int:
+    """Return how many leading columns of a sheet grid can produce output.
+    
+    A cell past the last one with a value, a flagged background or a merge
+    ID renders as nothing, in flagged output too. Rows that add no columns
+    are dismissed with C-level slice checks before any per-cell loop.
+    """
+    width = 0
+    for row_values, row_bg, merge_row in zip(values, bg_rows, merge_rows):
+        row_width = len(row_values)
+        if row_width <= width:
+            continue
+        if (
+            row_values[width:].count(None) == row_width - width
+            and (row_bg is None or bg_flags.keys().isdisjoint(row_bg[width:]))
+            and (merge_row is None or not any(merge_row[width:]))
+        ):
+            continue
+        while (
+            row_width > width
+            and row_values[row_width - 1] is None
+            and (row_bg is None or row_bg[row_width - 1] not in bg_flags)
+            and (merge_row is None or not merge_row[row_width - 1])
+        ):
+            row_width -= 1
+        width = max(width, row_width)
+    return width
+
+
+def _cache_put(cache: dict, key: Any, value: Any) -> None:
+    """Insert into a converter cache, evicting the oldest entry beyond STYLE_CACHE_SIZE."""
+    if key not in cache and len(cache) >= STYLE_CACHE_SIZE:
+        del cache[next(iter(cache))]
+    cache[key] = value
 
 
 class XlsxConverter:
@@ -55,23 +260,30 @@ class XlsxConverter:
         """
         self.config = config or XlsxConverterConfig()
         self._patch_openpyxl_colors()
-        self._cached_theme_colors = None
+        # Keyed by workbook version (see _file_key), so repeated conversions reuse them
+        self._theme_cache: Dict[Any, Dict[int, str]] = {}
+        self._style_cache: Dict[Tuple[str, int, int], Dict[int, Tuple[Optional[str], Optional[str], Optional[str]]]] = {}
+        self._sst_cache: Dict[Tuple[str, int, int], list] = {}
+        self._sheet_cache: Dict[Tuple[Any, ...], SheetData] = {}
+        self._blank_text_cache: Dict[Tuple[Any, ...], bool] = {}
+        # Merged ranges are numbered from here, so IDs never collide within a conversion
+        self._merge_counter = 0
     
     def _patch_openpyxl_colors(self):
-        """Patch openpyxl to handle color validation issues."""
+        """Patch openpyxl to handle color validation issues (once per process)."""
+        global _OPENPYXL_PATCHED
+        # Patching again would wrap the already patched setter in another layer
+        if _OPENPYXL_PATCHED:
+            return
+        _OPENPYXL_PATCHED = True
+        
         import openpyxl.styles.colors
         original_rgb_set = openpyxl.styles.colors.RGB.__set__
         
         def patched_rgb_set(self, instance, value):
             if value is not None:
                 if isinstance(value, str):
-                    value = ''.join(c for c in value if c in '0123456789ABCDEFabcdef')
-                    if len(value) == 6:
-                        value = 'FF' + value
-                    elif len(value) < 6:
-                        value = value.ljust(8, '0')
-                    elif len(value) > 8:
-                        value = value[:8]
+                    value = _sanitize_rgb(value)
             try:
                 original_rgb_set(self, instance, value)
             except ValueError:
@@ -81,7 +293,7 @@ class XlsxConverter:
     
     def convert_to_csv(
         self,
-        input_file_path: str,
+        input_file_path: Union[str, Path, Workbook, bytes, BinaryIO],
         tab_name: str,
         output_format: Literal["csv", "html", "markdown"] = "csv",
         include_colors: bool = False,
@@ -101,7 +313,9 @@ class XlsxConverter:
         Convert an XLSX file to CSV with optional formatting flags.
         
         Args:
-            input_file_path: Path to the XLSX file
+            input_file_path: Path to the XLSX file, a workbook already loaded with
+                openpyxl.load_workbook (reused as is, e.g. across several sheets),
+                or the file's contents as bytes or a binary file object
             tab_name: Name of the sheet to convert
             output_format: Format to convert to (csv, html, or markdown)
             include_colors: Whether to include both foreground and background colors
@@ -120,16 +334,203 @@ class XlsxConverter:
         Returns:
             Formatted string in the requested format
             
+        Raises:
+            FileNotFoundError: If the input file doesn't exist
+            ValueError: If the tab name doesn't exist in the XLSX file
+        
+        Passing a loaded workbook skips re-reading the file for every sheet,
+        but bypasses the sheet cache and reads plain values with openpyxl.
+        In-memory contents are loaded into such a workbook for the call.
+        """
+        if output_format == "csv":
+            # One StringIO sink for the whole document instead of joining chunks
+            buffer = io.StringIO()
+            self.convert_to_file(
+                input_file_path, tab_name, buffer, output_format,
+                include_colors, include_bg_colors, include_fg_colors,
+                signal_merge, preserve_formats,
+                ignore_colors, ignore_bg_colors, ignore_fg_colors,
+                keep_empty_lines, add_location,
+                max_rows, max_columns
+            )
+            return buffer.getvalue()
+        return ''.join(self.convert_to_csv_iter(
+            input_file_path, tab_name, output_format,
+            include_colors, include_bg_colors, include_fg_colors,
+            signal_merge, preserve_formats,
+            ignore_colors, ignore_bg_colors, ignore_fg_colors,
+            keep_empty_lines, add_location,
+            max_rows, max_columns
+        ))
+    
+    def convert_to_csv_iter(
+        self,
+        input_file_path: Union[str, Path, Workbook, bytes, BinaryIO],
+        tab_name: str,
+        output_format: Literal["csv", "html", "markdown"] = "csv",
+        include_colors: bool = False,
+        include_bg_colors: bool = False,
+        include_fg_colors: bool = False,
+        signal_merge: bool = False,
+        preserve_formats: bool = False,
+        ignore_colors: Optional[str] = None,
+        ignore_bg_colors: Optional[str] = None,
+        ignore_fg_colors: Optional[str] = None,
+        keep_empty_lines: Optional[bool] = None,
+        add_location: Optional[bool] = None,
+        max_rows: Optional[int] = None,
+        max_columns: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Convert an XLSX file like convert_to_csv, yielding the output in chunks.
+        
+        The sheet is read (and any errors raised) when this method is called;
+        the returned iterator then produces CSV output a block of rows at a
+        time, so callers can stream it to a file without building the whole
+        document as one string. HTML and markdown output is yielded whole.
+        
+        Args:
+            Same as convert_to_csv
+            
+        Returns:
+            Iterator over consecutive pieces of the formatted output
+            
+        Raises:
+            FileNotFoundError: If the input file doesn't exist
+            ValueError: If the tab name doesn't exist in the XLSX file
+        """
+        df = self._read_sheet(
+            input_file_path, tab_name,
+            include_colors, include_bg_colors, include_fg_colors,
+            signal_merge, preserve_formats,
+            ignore_colors, ignore_bg_colors, ignore_fg_colors,
+            keep_empty_lines, add_location,
+            max_rows, max_columns
+        )
+        return self._iter_output(df, output_format)
+    
+    def convert_to_file(
+        self,
+        input_file_path: Union[str, Path, Workbook, bytes, BinaryIO],
+        tab_name: str,
+        stream: TextIO,
+        output_format: Literal["csv", "html", "markdown"] = "csv",
+        include_colors: bool = False,
+        include_bg_colors: bool = False,
+        include_fg_colors: bool = False,
+        signal_merge: bool = False,
+        preserve_formats: bool = False,
+        ignore_colors: Optional[str] = None,
+        ignore_bg_colors: Optional[str] = None,
+        ignore_fg_colors: Optional[str] = None,
+        keep_empty_lines: Optional[bool] = None,
+        add_location: Optional[bool] = None,
+        max_rows: Optional[int] = None,
+        max_columns: Optional[int] = None
+    ) -> None:
+        """
+        Convert an XLSX file like convert_to_csv, writing the output to a stream.
+        
+        CSV rows are written by pandas' csv writer straight into the stream, so
+        no intermediate string is built for the document. Open files with
+        newline='' so line endings are written unchanged.
+        
+        Args:
+            stream: Open text stream to write the output to
+            Other arguments are the same as convert_to_csv
+            
         Raises:
             FileNotFoundError: If the input file doesn't exist
             ValueError: If the tab name doesn't exist in the XLSX file
         """
-        # Verify file exists
-        path = Path(input_file_path)
-        if not path.exists():
-            raise FileNotFoundError(f"File not found: {input_file_path}")
-        if path.suffix.lower() not in ['.xlsx', '.xls']:
-            raise ValueError(f"File must be an Excel file (xlsx/xls), got: {path.suffix}")
+        df = self._read_sheet(
+            input_file_path, tab_name,
+            include_colors, include_bg_colors, include_fg_colors,
+            signal_merge, preserve_formats,
+            ignore_colors, ignore_bg_colors, ignore_fg_colors,
+            keep_empty_lines, add_location,
+            max_rows, max_columns
+        )
+        if output_format == "csv":
+            if self._is_plain_text_csv(df):
+                _text_csv_writer(stream).writerows(df.to_numpy(dtype=object).tolist())
+            else:
+                df.to_csv(stream, index=self.config.index, header=self.config.header)
+        else:
+            for chunk in self._iter_output(df, output_format):
+                stream.write(chunk)
+    
+    def _iter_output(self, df: pd.DataFrame, output_format: str) -> Iterator[str]:
+        """Yield the DataFrame rendered in the requested output format."""
+        if output_format == "csv":
+            if df.empty:
+                yield df.to_csv(index=self.config.index, header=self.config.header)
+                return
+            if self._is_plain_text_csv(df):
+                values = df.to_numpy(dtype=object)
+                for start in range(0, len(values), CSV_CHUNK_ROWS):
+                    buffer = io.StringIO()
+                    _text_csv_writer(buffer).writerows(values[start:start + CSV_CHUNK_ROWS].tolist())
+                    yield buffer.getvalue()
+                return
+            for start in range(0, len(df), CSV_CHUNK_ROWS):
+                yield df.iloc[start:start + CSV_CHUNK_ROWS].to_csv(
+                    index=self.config.index,
+                    header=self.config.header and start == 0
+                )
+        elif output_format == "html":
+            yield df.to_html(index=self.config.index, header=self.config.header)
+        elif output_format == "markdown":
+            yield df.to_markdown(index=self.config.index)
+    
+    def _is_plain_text_csv(self, df: pd.DataFrame) -> bool:
+        """Whether df can skip pandas' CSV formatter (text cells only, no header or index)."""
+        return bool(df.attrs.get(TEXT_CELLS_ATTR)) and not self.config.header and not self.config.index
+    
+    def _read_sheet(
+        self,
+        input_file_path: Union[str, Path, Workbook, bytes, BinaryIO],
+        tab_name: str,
+        include_colors: bool,
+        include_bg_colors: bool,
+        include_fg_colors: bool,
+        signal_merge: bool,
+        preserve_formats: bool,
+        ignore_colors: Optional[str],
+        ignore_bg_colors: Optional[str],
+        ignore_fg_colors: Optional[str],
+        keep_empty_lines: Optional[bool],
+        add_location: Optional[bool],
+        max_rows: Optional[int],
+        max_columns: Optional[int]
+    ) -> pd.DataFrame:
+        """Validate the input and read the sheet into a DataFrame with flags embedded."""
+        if isinstance(input_file_path, (bytes, bytearray, memoryview)) or hasattr(input_file_path, 'read'):
+            # In-memory contents have no path to cache by; read them as a loaded workbook
+            source = input_file_path if hasattr(input_file_path, 'read') else io.BytesIO(input_file_path)
+            wb = load_workbook(source, read_only=self.config.read_only, data_only=self.config.data_only, keep_links=False)
+            try:
+                return self._read_sheet(
+                    wb, tab_name,
+                    include_colors, include_bg_colors, include_fg_colors,
+                    signal_merge, preserve_formats,
+                    ignore_colors, ignore_bg_colors, ignore_fg_colors,
+                    keep_empty_lines, add_location,
+                    max_rows, max_columns
+                )
+            finally:
+                wb.close()
+        
+        if isinstance(input_file_path, Workbook):
+            source_name = "the workbook"
+        else:
+            # Verify file exists; a directory would otherwise reach every reader engine
+            path = Path(input_file_path)
+            if not path.is_file():
+                raise FileNotFoundError(f"File not found: {input_file_path}")
+            if path.suffix.lower() not in ['.xlsx', '.xls']:
+                raise ValueError(f"File must be an Excel file (xlsx/xls), got: {path.suffix}")
+            source_name = path.name
         
         try:
             # Determine feature flags
@@ -186,24 +587,18 @@ class XlsxConverter:
                     max_rows, max_columns, should_keep_empty_lines
                 )
             
-            # Convert to requested format
-            if output_format == "csv":
-                return df.to_csv(index=self.config.index, header=self.config.header)
-            elif output_format == "html":
-                return df.to_html(index=self.config.index, header=self.config.header)
-            elif output_format == "markdown":
-                return df.to_markdown(index=self.config.index)
-            
+            return df
+        
         except ValueError as e:
             if "No sheet named" in str(e) or "not found" in str(e):
-                raise ValueError(f"Sheet '{tab_name}' not found in {path.name}")
+                raise ValueError(f"Sheet '{tab_name}' not found in {source_name}")
             raise
     
-    def _read_excel_with_fallback(self, file_path: str, sheet_name: str, keep_default_na: bool, max_rows: int = 300, max_columns: int = 100, keep_empty_lines: bool = False) -> pd.DataFrame:
+    def _read_excel_with_fallback(self, file_path: Union[str, Workbook], sheet_name: str, keep_default_na: bool, max_rows: int = 300, max_columns: int = 100, keep_empty_lines: bool = False) -> pd.DataFrame:
         """Read Excel file with multiple engine fallbacks.
         
         Args:
-            file_path: Path to the Excel file
+            file_path: Path to the Excel file, or a loaded Workbook
             sheet_name: Name of the sheet to read
             keep_default_na: Whether to keep default NA values
             max_rows: Maximum number of rows to read
@@ -215,82 +610,50 @@ class XlsxConverter:
         """
         exceptions = []
         
-        # Try calamine engine first
-        try:
-            df = pd.read_excel(file_path, sheet_name=sheet_name, 
-                               keep_default_na=keep_default_na, engine='calamine', nrows=max_rows, header=None)
-            # Limit columns
-            if len(df.columns) > max_columns:
-                df = df.iloc[:, :max_columns]
-            # Rename columns to Excel-style letters
-            df.columns = [get_column_letter(i + 1) for i in range(len(df.columns))]
-            # Remove empty rows if needed
-            if not keep_empty_lines:
-                df = self._remove_empty_rows(df)
-            # Always trim trailing empty rows
-            df = self._trim_trailing_empty_rows(df)
-            return df
-        except Exception as e:
-            exceptions.append(f"Calamine: {e}")
+        # pandas reuses a loaded workbook through ExcelFile without closing it
+        is_workbook = isinstance(file_path, Workbook)
+        source = pd.ExcelFile(file_path, engine='openpyxl') if is_workbook else file_path
         
-        # Try openpyxl
-        try:
-            df = pd.read_excel(file_path, sheet_name=sheet_name, 
-                               keep_default_na=keep_default_na, engine='openpyxl', nrows=max_rows, header=None)
-            # Limit columns
-            if len(df.columns) > max_columns:
-                df = df.iloc[:, :max_columns]
-            # Rename columns to Excel-style letters
-            df.columns = [get_column_letter(i + 1) for i in range(len(df.columns))]
-            # Remove empty rows if needed
-            if not keep_empty_lines:
-                df = self._remove_empty_rows(df)
-            # Always trim trailing empty rows
-            df = self._trim_trailing_empty_rows(df)
-            return df
-        except Exception as e:
-            exceptions.append(f"Openpyxl: {e}")
+        # Try calamine first (skipped when openpyxl is configured), then pandas' openpyxl and xlrd engines
+        engines = ['openpyxl', 'xlrd']
+        if self.config.engine == 'calamine' and not is_workbook and not self._has_blank_text(file_path, sheet_name):
+            engines.insert(0, 'calamine')
         
-        # Try xlrd
-        try:
-            df = pd.read_excel(file_path, sheet_name=sheet_name, 
-                               keep_default_na=keep_default_na, engine='xlrd', nrows=max_rows, header=None)
-            # Limit columns
-            if len(df.columns) > max_columns:
-                df = df.iloc[:, :max_columns]
-            # Rename columns to Excel-style letters
-            df.columns = [get_column_letter(i + 1) for i in range(len(df.columns))]
-            # Remove empty rows if needed
-            if not keep_empty_lines:
-                df = self._remove_empty_rows(df)
-            # Always trim trailing empty rows
-            df = self._trim_trailing_empty_rows(df)
-            return df
-        except Exception as e:
-            exceptions.append(f"Xlrd: {e}")
+        for engine in engines:
+            try:
+                if engine == 'calamine':
+                    df = self._read_with_calamine(file_path, sheet_name, keep_default_na, max_rows, max_columns)
+                else:
+                    df = pd.read_excel(source, sheet_name=sheet_name,
+                                       keep_default_na=keep_default_na, engine=engine, nrows=max_rows, header=None)
+                return self._finalize_df(df, max_columns, keep_empty_lines)
+            except Exception as e:
+                exceptions.append(f"{engine.capitalize()}: {e}")
         
         # Direct openpyxl reading
         try:
             warnings.filterwarnings('ignore')
-            wb = load_workbook(file_path, data_only=True, keep_links=False)
-            ws = wb[sheet_name]
-            
-            data = []
-            for row in ws.iter_rows(values_only=True, max_row=max_rows, max_col=max_columns):
-                data.append(row)
+            # Stream the rows in read-only mode; only the first max_rows are parsed
+            wb = file_path if is_workbook else load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+            try:
+                ws = wb[sheet_name]
+                
+                if isinstance(ws, ReadOnlyWorksheet):
+                    # Same grid as iter_rows(values_only=True), without a dict per cell
+                    data = _xlsx_fast.read_sheet(ws, max_rows, max_columns)[0]
+                else:
+                    data = list(ws.iter_rows(values_only=True, max_row=max_rows, max_col=max_columns))
+            finally:
+                # Read-only workbooks hold the zip file open until closed
+                if not is_workbook:
+                    wb.close()
             
             if data:
                 df = pd.DataFrame(data)
-                # Rename columns to Excel-style letters
-                df.columns = [get_column_letter(i + 1) for i in range(len(df.columns))]
                 if not keep_default_na:
-                    df = df.fillna('')
-                # Remove empty rows if needed
-                if not keep_empty_lines:
-                    df = self._remove_empty_rows(df)
-                # Always trim trailing empty rows
-                df = self._trim_trailing_empty_rows(df)
-                return df
+                    # The frame is our own, so fill it without a second copy
+                    df.fillna('', inplace=True)
+                return self._finalize_df(df, max_columns, keep_empty_lines)
             return pd.DataFrame()
             
         except Exception as e:
@@ -303,37 +666,141 @@ class XlsxConverter:
         
         raise Exception(f"Unable to read Excel file: {'; '.join(exceptions)}")
     
-    def _extract_theme_colors(self, file_path: str) -> Dict[int, str]:
-        """Extract theme colors from XLSX file."""
+    def _finalize_df(self, df: pd.DataFrame, max_columns: int, keep_empty_lines: bool) -> pd.DataFrame:
+        """Apply the shared post-processing of a plain read.
+        
+        Args:
+            df: DataFrame as read by one of the engines
+            max_columns: Maximum number of columns to keep
+            keep_empty_lines: Whether to keep empty rows
+            
+        Returns:
+            pd.DataFrame: DataFrame with letter column names and empty rows handled
+        """
+        # Limit columns before anything looks at them
+        if len(df.columns) > max_columns:
+            df = df.iloc[:, :max_columns]
+        # Rename columns to Excel-style letters
+        df.columns = list(_assemble.column_letters(len(df.columns)))
+        if df.empty:
+            return df
+        # One content scan serves both the empty-row removal and the trim
+        row_content = _rows_with_content(df)
+        # Remove empty rows if needed
+        if not keep_empty_lines:
+            df = df[row_content]
+            row_content = row_content[row_content]
+        # Always trim trailing empty rows
+        return self._trim_trailing_empty_rows(df, row_content)
+    
+    def _read_with_calamine(self, file_path: str, sheet_name: str, keep_default_na: bool, max_rows: int, max_columns: int) -> pd.DataFrame:
+        """Read a sheet's values with python-calamine.
+        
+        pandas only ships a calamine engine from 2.2 on, so the rows are read with
+        python-calamine directly and parsed with pandas' TextParser, converting
+        cells the same way pd.read_excel does for the other engines.
+        
+        Args:
+            file_path: Path to the Excel file
+            sheet_name: Name of the sheet to read
+            keep_default_na: Whether to keep default NA values
+            max_rows: Maximum number of rows to read
+            max_columns: Maximum number of columns to convert
+            
+        Returns:
+            pd.DataFrame: The loaded dataframe with integer column labels
+        """
+        workbook = CalamineWorkbook.from_path(file_path)
+        try:
+            try:
+                sheet = workbook.get_sheet_by_name(sheet_name)
+            except WorksheetNotFound:
+                raise ValueError(f"Worksheet named '{sheet_name}' not found")
+            rows = sheet.to_python(skip_empty_area=False, nrows=max_rows)
+        finally:
+            workbook.close()
+        
+        data = []
+        last_row_with_data = -1
+        max_width = 0
+        convert = self._convert_calamine_cell
+        for row_number, row in enumerate(rows):
+            # Text and numbers, nearly every cell, are converted inline
+            converted_row = [
+                value if type(value) is str
+                else (int(value) if value.is_integer() else value) if type(value) is float
+                else convert(value)
+                for value in row[:max_columns]
+            ]
+            # Trim trailing empty cells and rows, as pandas' readers do:
+            # the frame is as wide as the widest row with content
+            row_width = len(converted_row)
+            while row_width and converted_row[row_width - 1] == '':
+                row_width -= 1
+            if row_width:
+                last_row_with_data = row_number
+                max_width = max(max_width, row_width)
+            data.append(converted_row)
+        data = data[:last_row_with_data + 1]
+        
+        if not data:
+            return pd.DataFrame()
+        
+        # The calamine range is rectangular, so cutting each row to the
+        # frame width is enough; only ragged rows need padding
+        data = [
+            row[:max_width] if len(row) >= max_width else row + [''] * (max_width - len(row))
+            for row in data
+        ]
+        
+        parser = TextParser(data, header=None, keep_default_na=keep_default_na,
+                            nrows=max_rows, skip_blank_lines=False)
+        return parser.read(nrows=max_rows)
+    
+    @staticmethod
+    def _convert_calamine_cell(value: Any) -> Any:
+        """Convert a calamine cell value to what pandas' Excel readers produce."""
+        if isinstance(value, float):
+            # calamine reports every number as a float
+            as_int = int(value)
+            return as_int if as_int == value else value
+        if isinstance(value, date):
+            return pd.Timestamp(value)
+        if isinstance(value, timedelta):
+            return pd.Timedelta(value)
+        return value
+    
+    def _extract_theme_colors(self, file_path: Union[str, Workbook]) -> Dict[int, str]:
+        """Extract theme colors from XLSX file (or the theme of a loaded workbook)."""
         theme_colors = {}
         
         try:
-            with zipfile.ZipFile(file_path, 'r') as zip_file:
-                if 'xl/theme/theme1.xml' in zip_file.namelist():
-                    theme_xml = zip_file.read('xl/theme/theme1.xml')
-                    root = etree.fromstring(theme_xml)
-                    
-                    ns = {'a': 'http://schemas.openxmlformats.org/drawingml/2006/main'}
-                    color_scheme = root.find('.//a:clrScheme', ns)
-                    
-                    if color_scheme is not None:
-                        color_map = [
-                            ('lt1', 0), ('dk1', 1), ('lt2', 2), ('dk2', 3),
-                            ('accent1', 4), ('accent2', 5), ('accent3', 6),
-                            ('accent4', 7), ('accent5', 8), ('accent6', 9),
-                            ('hlink', 10), ('folHlink', 11)
-                        ]
+            if isinstance(file_path, Workbook):
+                theme_xml = file_path.loaded_theme
+            else:
+                theme_xml = None
+                with zipfile.ZipFile(file_path, 'r') as zip_file:
+                    if 'xl/theme/theme1.xml' in zip_file.namelist():
+                        theme_xml = zip_file.read('xl/theme/theme1.xml')
+            
+            if theme_xml:
+                # openpyxl's XML parser: lxml when installed, else ElementTree
+                root = parse_xml(theme_xml)
+                color_scheme = root.find(_CLR_SCHEME_PATH)
+                
+                if color_scheme is not None:
+                    # One pass over the scheme's children instead of a search per slot
+                    for elem in color_scheme:
+                        idx = _THEME_COLOR_INDEX.get(elem.tag)
+                        if idx is None or idx in theme_colors:
+                            continue
+                        srgb = elem.find(_SRGB_CLR_PATH)
+                        sys_color = elem.find(_SYS_CLR_PATH)
                         
-                        for color_name, idx in color_map:
-                            elem = color_scheme.find(f'.//a:{color_name}', ns)
-                            if elem is not None:
-                                srgb = elem.find('.//a:srgbClr', ns)
-                                sys_color = elem.find('.//a:sysClr', ns)
-                                
-                                if srgb is not None:
-                                    theme_colors[idx] = srgb.get('val')
-                                elif sys_color is not None:
-                                    theme_colors[idx] = sys_color.get('lastClr', '000000')
+                        if srgb is not None:
+                            theme_colors[idx] = srgb.get('val')
+                        elif sys_color is not None:
+                            theme_colors[idx] = sys_color.get('lastClr', '000000')
         except Exception:
             pass
         
@@ -344,28 +811,11 @@ class XlsxConverter:
         if not tint or tint == 0:
             return rgb_hex
         
-        # Convert hex to RGB
-        r = int(rgb_hex[0:2], 16) / 255.0
-        g = int(rgb_hex[2:4], 16) / 255.0
-        b = int(rgb_hex[4:6], 16) / 255.0
-        
-        # Convert to HSL
-        h, l, s = colorsys.rgb_to_hls(r, g, b)
-        
-        # Apply tint
-        if tint < 0:
-            l = l * (1 + tint)  # Make darker
-        else:
-            l = l + (1 - l) * tint  # Make lighter
-        
-        # Convert back to RGB
-        r, g, b = colorsys.hls_to_rgb(h, l, s)
-        
-        return f"{int(r * 255):02X}{int(g * 255):02X}{int(b * 255):02X}"
+        return _tint_rgb(rgb_hex, tint)
     
     def _read_excel_with_formatting(
         self,
-        file_path: str,
+        file_path: Union[str, Workbook],
         sheet_name: str,
         include_bg_colors: bool = False,
         include_fg_colors: bool = False,
@@ -387,7 +837,7 @@ class XlsxConverter:
         - Location: value{l:A5} where A5 is the Excel coordinate
         
         Args:
-            file_path: Path to the Excel file
+            file_path: Path to the Excel file, or a loaded Workbook
             sheet_name: Name of the sheet to read
             include_bg_colors: Whether to include background color information
             include_fg_colors: Whether to include foreground color information
@@ -407,131 +857,381 @@ class XlsxConverter:
         bg_ignore_list = bg_ignore_list or set()
         fg_ignore_list = fg_ignore_list or set()
         
-        wb = load_workbook(file_path, data_only=True)
-        if sheet_name not in wb.sheetnames:
-            raise ValueError(f"Sheet '{sheet_name}' not found in the Excel file")
+        sheet = self._load_sheet(
+            file_path, sheet_name, max_rows, max_columns,
+            with_colors=include_bg_colors or include_fg_colors,
+            with_formats=preserve_formats
+        )
         
-        ws = wb[sheet_name]
+        # Merge IDs per row (0 = not merged), only for the rows a merged range
+        # touches; the other rows get None and skip the merge step entirely
+        merge_rows = None
+        merge_flags = {0: ''}
+        if signal_merge and sheet.merged_ranges:
+            n_rows = len(sheet.values)
+            n_cols = max((len(row) for row in sheet.values), default=0)
+            merge_rows = [None] * n_rows
+            for min_row, min_col, max_row, max_col in sheet.merged_ranges:
+                # Only process merged cells within our limits
+                if min_row <= max_rows and min_col <= max_columns:
+                    # Stay within the six digits of the {MG:XXXXXX} flag
+                    merge_id = MERGE_ID_BASE + self._merge_counter % MERGE_ID_SPAN
+                    self._merge_counter += 1
+                    last_col = min(max_col, max_columns, n_cols)
+                    span = [merge_id] * (last_col - min_col + 1)
+                    for row in range(min_row - 1, min(max_row, max_rows, n_rows)):
+                        if merge_rows[row] is None:
+                            merge_rows[row] = [0] * n_cols
+                        merge_rows[row][min_col - 1:last_col] = span
+                    merge_flags[merge_id] = sys.intern(f"{{MG:{merge_id}}}")
         
-        # Clear cached theme colors
-        self._cached_theme_colors = None
+        # Process all cells with a row loop specialized for the requested flags
+        assemble_row = _assemble.build_row_assembler(_assemble.option_bits(
+            include_bg_colors, include_fg_colors, signal_merge, preserve_formats, add_location
+        ))
+        bg_flags, fg_flags, black_fg_flags = _assemble.color_flags(
+            sheet.bg_colors, sheet.fg_colors, bg_ignore_list, fg_ignore_list
+        )
+        no_rows = repeat(None)
+        # A sheet without rows (read-only mode) stands for an empty
+        # max_columns wide grid, as openpyxl's full-mode iter_rows gives it
+        grid_width = max((len(row) for row in sheet.values), default=max_columns)
+        # Cells right of the last column that can carry output come out
+        # empty and would only be trimmed again, so rows are cut to it first;
+        # a narrow sheet then doesn't pay for all max_columns columns
+        n_cols = _content_width(
+            sheet.values,
+            sheet.bg_colors if include_bg_colors else no_rows,
+            merge_rows if merge_rows is not None else no_rows,
+            bg_flags
+        )
+        location_prefixes = _assemble.location_prefixes(n_cols) if add_location else None
         
-        # Build merge map
-        merge_map = {}
-        if signal_merge and ws.merged_cells:
-            for merged_range in ws.merged_cells.ranges:
-                # Only process merged cells within our limits
-                if merged_range.min_row <= max_rows and merged_range.min_col <= max_columns:
-                    merge_id = str(random.randint(100000, 999999))
-                    # Mark all cells in the merged range with the same ID (within limits)
-                    for row in range(merged_range.min_row, min(merged_range.max_row + 1, max_rows + 1)):
-                        for col in range(merged_range.min_col, min(merged_range.max_col + 1, max_columns + 1)):
-                            merge_map[(row, col)] = merge_id
-        
-        # Process all cells
-        processed_data = []
-        
-        for row_idx, row in enumerate(ws.iter_rows(max_row=max_rows, max_col=max_columns), 1):
-            row_data = []
-            has_content = False
-            
-            for col_idx, cell in enumerate(row, 1):
-                value = cell.value
-                if value is not None:
-                    has_content = True
-                
-                # Apply formatting if requested
-                if preserve_formats and value is not None:
-                    try:
-                        if cell.number_format and cell.number_format != 'General':
-                            value = ExcelFormatter.format_value(value, cell.number_format)
-                    except:
-                        pass
-                
-                formatting_parts = []
-                
-                # Extract background color if requested
-                has_background = False
-                if include_bg_colors:
-                    bg_color_hex = self._extract_cell_bg_color(cell, file_path)
-                    if bg_color_hex:
-                        color_to_check = bg_color_hex[1:] if bg_color_hex.startswith('#') else bg_color_hex
-                        if color_to_check.upper() not in bg_ignore_list:
-                            # Use backward-compatible {#RRGGBB} format by default
-                            formatting_parts.append(f"{{{bg_color_hex}}}")
-                            has_background = True
-                
-                # Extract foreground color if requested and cell has content
-                if include_fg_colors and value is not None:
-                    fg_color_hex = self._extract_cell_fg_color(cell, file_path)
-                    if fg_color_hex:
-                        color_to_check = fg_color_hex[1:] if fg_color_hex.startswith('#') else fg_color_hex
-                        if color_to_check.upper() not in fg_ignore_list:
-                            # Only include black foreground color if there's also a background color (for contrast)
-                            if color_to_check.upper() == '000000':
-                                # Check if this cell has a background color
-                                if not has_background and not include_bg_colors:
-                                    # Need to check for background if we haven't already
-                                    bg_color = self._extract_cell_bg_color(cell, file_path)
-                                    has_background = bg_color is not None
-                                # Only include black text if there's a background
-                                if has_background:
-                                    formatting_parts.append(f"{{fc:{fg_color_hex}}}")
-                            else:
-                                # Non-black colors are always included
-                                formatting_parts.append(f"{{fc:{fg_color_hex}}}")
-                
-                # Add merge info if requested
-                if signal_merge and (cell.row, cell.column) in merge_map:
-                    merge_id = merge_map[(cell.row, cell.column)]
-                    formatting_parts.append(f"{{MG:{merge_id}}}")
-                
-                # Add location if requested and cell is non-empty (has value, color, or merge flag)
-                if add_location and (value is not None or formatting_parts):
-                    column_letter = get_column_letter(cell.column)
-                    location_tag = f"{{l:{column_letter}{cell.row}}}"
-                    formatting_parts.append(location_tag)
-                
-                # Combine value and formatting
-                if value is not None:
-                    cell_value = str(value) + ''.join(formatting_parts)
-                elif formatting_parts:
-                    cell_value = ''.join(formatting_parts)
-                else:
-                    cell_value = None
-                
-                row_data.append(cell_value)
+        # Rows are written straight into an object array, which pandas wraps
+        # without converting a list of lists column by column
+        data = np.empty((len(sheet.values), n_cols), dtype=object)
+        n_filled = 0
+        
+        # Which grids the assembler reads is fixed for the whole sheet, so
+        # pick the per-row arguments once instead of testing options per row
+        rows = zip(
+            sheet.values,
+            sheet.number_formats if preserve_formats else no_rows,
+            sheet.bg_colors if include_bg_colors or include_fg_colors else no_rows,
+            sheet.fg_colors if include_fg_colors else no_rows,
+            merge_rows if merge_rows is not None else no_rows
+        )
+        
+        for row_idx, (row_values, row_formats, row_bg, row_fg, merge_row) in enumerate(rows, 1):
+            if len(row_values) > n_cols:
+                row_values = row_values[:n_cols]
+            # Counting in C is cheaper than a generator over the cells
+            has_content = row_values.count(None) != len(row_values)
             
             # keep_empty_lines is useful if we want to preserve the original row positions
             if has_content or keep_empty_lines:
-                processed_data.append(row_data)
+                data[n_filled] = assemble_row(
+                    row_idx, row_values, row_formats, row_bg, row_fg, merge_row,
+                    bg_flags, fg_flags, black_fg_flags, merge_flags, location_prefixes
+                )
+                n_filled += 1
         
-        if not processed_data:
+        # With keep_empty_lines an empty grid still keeps its columns below
+        if not n_filled and not keep_empty_lines:
             return pd.DataFrame()
         
-        # Create DataFrame
-        # Ensure all rows have same number of columns
-        max_cols = max(len(row) for row in processed_data) if processed_data else 0
-        for row in processed_data:
-            while len(row) < max_cols:
-                row.append(None)
+        data = data[:n_filled]
+        
+        # Fill NaN values if needed, in place rather than into a second array
+        if not self.config.keep_default_na:
+            data[pd.isna(data)] = ''
         
         # Create DataFrame with column letters as headers (A, B, C, ...)
         # This provides meaningful column names for CSV output
-        column_names = [get_column_letter(i) for i in range(1, max_cols + 1)]
-        df = pd.DataFrame(processed_data, columns=column_names)
-        
-        # Fill NaN values if needed
-        if not self.config.keep_default_na:
-            df = df.fillna('')
+        column_names = list(_assemble.column_letters(n_cols))
+        df = pd.DataFrame(data, columns=column_names, copy=False)
         
         # Always trim trailing empty rows (even when keep_empty_lines=True)
         # keep_empty_lines only preserves empty rows within the content area
         df = self._trim_trailing_empty_rows(df)
+        if not n_cols or df.empty:
+            # Nothing survived the trim, which keeps the columns of the full grid
+            df = pd.DataFrame(columns=list(_assemble.column_letters(grid_width)))
+        
+        # Every cell is a string or None, which csv.writer renders exactly like pandas
+        df.attrs[TEXT_CELLS_ATTR] = True
         
         return df
     
-    def _extract_cell_fg_color(self, cell, file_path: str) -> Optional[str]:
+    def _load_sheet(
+        self,
+        file_path: Union[str, Workbook],
+        sheet_name: str,
+        max_rows: int,
+        max_columns: int,
+        with_colors: bool,
+        with_formats: bool
+    ) -> SheetData:
+        """Load the raw cell grid of a sheet, reusing earlier loads where possible.
+        
+        Grids parsed by this converter are kept in memory per workbook version,
+        so conversions of an unchanged file that only differ in their flags
+        skip the parse; the on-disk cache is consulted next when enabled.
+        
+        Args:
+            file_path: Path to the Excel file, or a loaded Workbook
+            sheet_name: Name of the sheet to read
+            max_rows: Maximum number of rows to read
+            max_columns: Maximum number of columns to read
+            with_colors: Whether to resolve background and foreground colors
+            with_formats: Whether to read number formats
+            
+        Returns:
+            SheetData: Values, number formats, colors and merged ranges of the sheet;
+            merged ranges are always read, with the cells they cover blanked
+        """
+        is_workbook = isinstance(file_path, Workbook)
+        memo_key = None
+        if not is_workbook:
+            memo_key = (self._file_key(file_path), sheet_name, max_rows, max_columns, self.config.data_only)
+            # Colors and formats only add grids, so a load that has them serves
+            # a request without them
+            for colors, formats in ((with_colors, with_formats), (True, with_formats),
+                                    (with_colors, True), (True, True)):
+                sheet = self._sheet_cache.get(memo_key + (colors, formats))
+                if sheet is not None:
+                    return sheet
+            memo_key += (with_colors, with_formats)
+        
+        cache_key = None
+        if self.config.cache_dir and not is_workbook:
+            cache_key = _wbcache.cache_key(
+                file_path, sheet_name, max_rows, max_columns,
+                with_colors, with_formats, self.config.data_only
+            )
+            sheet = _wbcache.load(self.config.cache_dir, cache_key)
+            if sheet is not None:
+                _cache_put(self._sheet_cache, memo_key, sheet)
+                return sheet
+        
+        if is_workbook:
+            wb = file_path
+        else:
+            # The shared strings of an unchanged file are reused across sheets and conversions
+            key = self._file_key(file_path)
+            wb, shared_strings = _xlsx_fast.open_workbook(
+                file_path, self.config.read_only, self.config.data_only,
+                shared_strings=self._sst_cache.get(key)
+            )
+            _cache_put(self._sst_cache, key, shared_strings)
+        try:
+            if sheet_name not in wb.sheetnames:
+                raise ValueError(f"Sheet '{sheet_name}' not found in the Excel file")
+            
+            ws = wb[sheet_name]
+            
+            values = []
+            number_formats = []
+            bg_colors = []
+            fg_colors = []
+            
+            if isinstance(ws, ReadOnlyWorksheet):
+                # One pass over the sheet XML yields values, style ids and merges
+                values, style_ids, merged_ranges = _xlsx_fast.read_sheet(ws, max_rows, max_columns)
+                if with_colors or with_formats:
+                    style_table = self._build_style_table(ws, style_ids, file_path, with_formats, with_colors)
+                    rows = list(zip(values, style_ids))
+                    if with_formats:
+                        number_formats = [
+                            [style_table[style_id][0] if value is not None else None
+                             for value, style_id in zip(row_values, row_styles)]
+                            for row_values, row_styles in rows
+                        ]
+                    if with_colors:
+                        bg_colors = [[style_table[style_id][1] for style_id in row_styles] for row_styles in style_ids]
+                        # Foreground colors are only flagged for cells with content
+                        fg_colors = [
+                            [style_table[style_id][2] if value is not None else None
+                             for value, style_id in zip(row_values, row_styles)]
+                            for row_values, row_styles in rows
+                        ]
+            else:
+                # Cells loaded with equal style arrays have equal formats and
+                # colors, so each distinct style is resolved once. The style
+                # arrays cannot be mapped back to the workbook's style ids:
+                # openpyxl re-indexes duplicate styles and gives merged cells
+                # new border styles.
+                style_table = {}
+                # Bound once: the cell loop runs for every cell of the sheet
+                with_styles = with_formats or with_colors
+                styles_for = style_table.get
+                resolve_style = self._resolve_cell_style
+                fill_colors = {}
+                font_colors = {}
+                for row in ws.iter_rows(max_row=max_rows, max_col=max_columns):
+                    row_values = []
+                    row_formats = []
+                    row_bg = []
+                    row_fg = []
+                    
+                    for cell in row:
+                        value = cell.value
+                        row_values.append(value)
+                        
+                        if with_styles:
+                            style = cell._style
+                            styles = styles_for(style)
+                            if styles is None:
+                                styles = style_table[style] = resolve_style(cell, style, file_path, fill_colors, font_colors)
+                            if with_formats:
+                                row_formats.append(styles[0] if value is not None else None)
+                            if with_colors:
+                                row_bg.append(styles[1])
+                                # Foreground colors are only flagged for cells with content
+                                row_fg.append(styles[2] if value is not None else None)
+                    
+                    values.append(row_values)
+                    number_formats.append(row_formats)
+                    bg_colors.append(row_bg)
+                    fg_colors.append(row_fg)
+                
+                merged_ranges = [
+                    (merged_range.min_row, merged_range.min_col, merged_range.max_row, merged_range.max_col)
+                    for merged_range in ws.merged_cells.ranges
+                ]
+        finally:
+            # A workbook passed in by the caller stays open for their next sheet
+            if not is_workbook:
+                wb.close()
+        
+        # Only the top-left cell of a merged range carries its value and style;
+        # read-only mode reports whatever is stored for the covered cells, so
+        # blank them to match what the full workbook model exposes
+        grids = [values]
+        if with_formats:
+            grids.append(number_formats)
+        if with_colors:
+            grids += [bg_colors, fg_colors]
+        for min_row, min_col, max_row, max_col in merged_ranges:
+            # Blank each row's covered span with one slice assignment per grid
+            for row in range(min_row, min(max_row, len(values)) + 1):
+                first_col = min_col + 1 if row == min_row else min_col
+                last_col = min(max_col, max_columns, len(values[row - 1]))
+                if first_col > last_col:
+                    continue
+                blank = [None] * (last_col - first_col + 1)
+                for grid in grids:
+                    grid[row - 1][first_col - 1:last_col] = blank
+        
+        sheet = SheetData(values, number_formats, bg_colors, fg_colors, merged_ranges)
+        
+        if cache_key is not None:
+            _wbcache.store(self.config.cache_dir, cache_key, sheet)
+        if memo_key is not None:
+            _cache_put(self._sheet_cache, memo_key, sheet)
+        
+        return sheet
+    
+    def _build_style_table(
+        self,
+        ws,
+        style_ids: List[List[Optional[int]]],
+        file_path: Union[str, Workbook],
+        with_formats: bool,
+        with_colors: bool
+    ) -> Dict[Optional[int], Tuple[Optional[str], Optional[str], Optional[str]]]:
+        """Resolve every style used by a sheet into (number_format, bg_color, fg_color).
+        
+        Formats and colors depend only on the cell style, so each distinct
+        style id of the sheet is resolved once, up front, and the cell grids
+        are then filled with plain lookups. None (no cell) maps to no style.
+        """
+        key = self._file_key(file_path)
+        resolved = self._style_cache.get(key) if key is not None else None
+        if resolved is None:
+            resolved = {}
+            if key is not None:
+                _cache_put(self._style_cache, key, resolved)
+        
+        style_table = {None: (None, None, None)}
+        cell_styles = ws.parent._cell_styles
+        fill_colors = {}
+        font_colors = {}
+        for style_id in set(chain.from_iterable(style_ids)):
+            if style_id is None:
+                continue
+            styles = resolved.get(style_id)
+            if styles is None:
+                cell = ReadOnlyCell(ws, 1, 1, None, style_id=style_id)
+                styles = resolved[style_id] = self._resolve_cell_style(
+                    cell, cell_styles[style_id], file_path, fill_colors, font_colors
+                )
+            style_table[style_id] = (
+                styles[0] if with_formats else None,
+                styles[1] if with_colors else None,
+                styles[2] if with_colors else None
+            )
+        return style_table
+    
+    def _resolve_cell_style(
+        self,
+        cell,
+        style,
+        file_path: Union[str, Workbook],
+        fill_colors: Dict[int, Optional[str]],
+        font_colors: Dict[int, Optional[str]]
+    ) -> Tuple[str, Optional[str], Optional[str]]:
+        """Resolve a cell's style into (number_format, bg_color, fg_color).
+        
+        style is the cell's StyleArray. Many styles share a fill or font (most
+        use the default ones), so the colors are memoized in fill_colors and
+        font_colors by the workbook's fill and font ids.
+        """
+        if style is None:
+            # Cells iter_rows makes up for gaps in the sheet carry no style array
+            return (
+                cell.number_format,
+                self._extract_cell_bg_color(cell, file_path),
+                self._extract_cell_fg_color(cell, file_path)
+            )
+        if style.fillId not in fill_colors:
+            fill_colors[style.fillId] = self._extract_cell_bg_color(cell, file_path)
+        if style.fontId not in font_colors:
+            font_colors[style.fontId] = self._extract_cell_fg_color(cell, file_path)
+        return (cell.number_format, fill_colors[style.fillId], font_colors[style.fontId])
+    
+    def _has_blank_text(self, file_path: str, sheet_name: str) -> bool:
+        """Whether calamine would read a sheet's whitespace-only strings as empty (checked once per file version)."""
+        key = (self._file_key(file_path), sheet_name)
+        found = self._blank_text_cache.get(key)
+        if found is None:
+            found = _xlsx_fast.has_unpreserved_blank_text(file_path, sheet_name)
+            _cache_put(self._blank_text_cache, key, found)
+        return found
+    
+    def _file_key(self, file_path: Union[str, Path, Workbook]) -> Optional[Tuple[str, int, int]]:
+        """Identify a version of a workbook file by path, mtime and size (None for loaded workbooks)."""
+        if isinstance(file_path, Workbook):
+            return None
+        stat = os.stat(file_path)
+        return (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    
+    def _theme_colors(self, file_path: Union[str, Workbook], workbook: Optional[Workbook] = None) -> Dict[int, str]:
+        """Return a workbook's theme colors, parsing its theme once per workbook version.
+        
+        workbook is the workbook loaded from file_path, if any; openpyxl has
+        already read the theme from its archive, so the file is not reopened.
+        """
+        # A loaded workbook has no file version, but its theme XML identifies the theme
+        key = file_path.loaded_theme if isinstance(file_path, Workbook) else self._file_key(file_path)
+        theme_colors = self._theme_cache.get(key)
+        if theme_colors is None:
+            source = workbook if isinstance(workbook, Workbook) else file_path
+            theme_colors = self._extract_theme_colors(source) or dict(_DEFAULT_THEME_COLORS)
+            _cache_put(self._theme_cache, key, theme_colors)
+        return theme_colors
+    
+    def _extract_cell_fg_color(self, cell, file_path: Union[str, Workbook]) -> Optional[str]:
         """Extract foreground (font) color from a cell."""
         if not cell.font or not cell.font.color:
             return None
@@ -541,19 +1241,7 @@ class XlsxConverter:
         try:
             if hasattr(color, 'type'):
                 if color.type == 'theme' and hasattr(color, 'theme') and color.theme is not None:
-                    # Load theme colors
-                    if self._cached_theme_colors is None:
-                        self._cached_theme_colors = self._extract_theme_colors(file_path)
-                    
-                    # Default theme colors if extraction fails
-                    if not self._cached_theme_colors:
-                        self._cached_theme_colors = {
-                            0: "FFFFFF", 1: "000000", 2: "E7E6E6", 3: "44546A",
-                            4: "5B9BD5", 5: "ED7D31", 6: "A5A5A5", 7: "FFC000",
-                            8: "4472C4", 9: "70AD47"
-                        }
-                    
-                    base_color = self._cached_theme_colors.get(color.theme, "000000")
+                    base_color = self._theme_colors(file_path, cell.parent.parent).get(color.theme, "000000")
                     
                     # Apply tint if present
                     tint = getattr(color, 'tint', 0)
@@ -580,7 +1268,7 @@ class XlsxConverter:
         
         return None
     
-    def _extract_cell_bg_color(self, cell, file_path: str) -> Optional[str]:
+    def _extract_cell_bg_color(self, cell, file_path: Union[str, Workbook]) -> Optional[str]:
         """Extract background color from a cell."""
         if not cell.fill or cell.fill.patternType != 'solid':
             return None
@@ -592,19 +1280,7 @@ class XlsxConverter:
         try:
             if hasattr(color, 'type'):
                 if color.type == 'theme' and hasattr(color, 'theme') and color.theme is not None:
-                    # Load theme colors
-                    if self._cached_theme_colors is None:
-                        self._cached_theme_colors = self._extract_theme_colors(file_path)
-                    
-                    # Default theme colors if extraction fails
-                    if not self._cached_theme_colors:
-                        self._cached_theme_colors = {
-                            0: "FFFFFF", 1: "000000", 2: "E7E6E6", 3: "44546A",
-                            4: "5B9BD5", 5: "ED7D31", 6: "A5A5A5", 7: "FFC000",
-                            8: "4472C4", 9: "70AD47"
-                        }
-                    
-                    base_color = self._cached_theme_colors.get(color.theme, "000000")
+                    base_color = self._theme_colors(file_path, cell.parent.parent).get(color.theme, "000000")
                     
                     # Apply tint if present
                     tint = getattr(color, 'tint', 0)
@@ -669,10 +1345,9 @@ class XlsxConverter:
             return df
         
         # Filter out rows where all values are either NaN or empty strings
-        mask = df.apply(lambda row: any(pd.notna(val) and str(val).strip() != '' for val in row), axis=1)
-        return df[mask]
+        return df[_rows_with_content(df)]
     
-    def _trim_trailing_empty_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _trim_trailing_empty_rows(self, df: pd.DataFrame, row_content: Optional[np.ndarray] = None) -> pd.DataFrame:
         """Trim trailing empty rows and columns from DataFrame.
         
         This is always applied, even when keep_empty_lines=True, because
@@ -681,6 +1356,7 @@ class XlsxConverter:
         
         Args:
             df: DataFrame to trim
+            row_content: _rows_with_content(df), if the caller already has it
             
         Returns:
             pd.DataFrame: DataFrame with trailing empty rows and columns removed
@@ -688,20 +1364,23 @@ class XlsxConverter:
         if df.empty:
             return df
         
+        non_text = np.array([dtype.kind in _NON_TEXT_KINDS for dtype in df.dtypes], dtype=bool)
+        
         # Find the last non-empty row by checking from the end
         last_non_empty_row = -1
-        for idx in range(len(df) - 1, -1, -1):
-            row = df.iloc[idx]
-            # Check if row has any non-empty values
-            has_content = False
-            for val in row:
-                if pd.notna(val) and str(val).strip() != '':
-                    has_content = True
+        if row_content is None and non_text.any():
+            row_content = _rows_with_content(df)
+        if row_content is not None:
+            # argmax finds the first True of the reversed mask, i.e. the last row with content
+            if row_content.any():
+                last_non_empty_row = len(row_content) - 1 - int(np.argmax(row_content[::-1]))
+        else:
+            # All-text frames: the scan usually stops within the last row
+            values = df.to_numpy(dtype=object)
+            for idx in range(len(values) - 1, -1, -1):
+                if _has_text(values[idx]):
+                    last_non_empty_row = idx
                     break
-            
-            if has_content:
-                last_non_empty_row = idx
-                break
         
         # If all rows are empty, return empty DataFrame
         if last_non_empty_row == -1:
@@ -710,24 +1389,22 @@ class XlsxConverter:
         # Trim to last non-empty row
         df = df.iloc[:last_non_empty_row + 1]
         
-        # Also find the last non-empty column
+        # Also find the last non-empty column (the last row has content, so there is one).
+        # Non-text columns are settled with one vectorized notna(); text columns
+        # are only scanned to the right of the last non-text column with content
         last_non_empty_col = -1
-        for col_idx in range(len(df.columns) - 1, -1, -1):
-            col = df.iloc[:, col_idx]
-            # Check if column has any non-empty values
-            has_content = False
-            for val in col:
-                if pd.notna(val) and str(val).strip() != '':
-                    has_content = True
+        if non_text.any():
+            non_text_content = df.iloc[:, non_text].notna().to_numpy().any(axis=0)
+            if non_text_content.any():
+                last_non_empty_col = np.flatnonzero(non_text)[np.flatnonzero(non_text_content)[-1]]
+        text_columns = np.flatnonzero(~non_text)
+        text_columns = text_columns[text_columns > last_non_empty_col]
+        if len(text_columns):
+            values = (df.iloc[:, text_columns] if non_text.any() else df).to_numpy(dtype=object)
+            for position in range(len(text_columns) - 1, -1, -1):
+                if _has_text(values[:, position]):
+                    last_non_empty_col = text_columns[position]
                     break
-            
-            if has_content:
-                last_non_empty_col = col_idx
-                break
-        
-        # If all columns are empty, return DataFrame with no columns
-        if last_non_empty_col == -1:
-            return pd.DataFrame()
         
         # Return DataFrame trimmed to last non-empty column
         return df.iloc[:, :last_non_empty_col + 1]
\ No newline at end of file
@@ -4,10 +4,21 @@ Excel format string parser and formatter.
 
 import re
 from decimal import Decimal
-from datetime import datetime, date
-from typing import Any, Union
+from datetime import datetime, date, timedelta
+from functools import lru_cache
+from typing import Any, Callable, Optional, Union
 import pandas as pd
 
+# Precompiled for the per-cell formatters below
+_DECIMALS_RE = re.compile(r'\.(\d+)')
+_CURRENCY_RE = re.compile(r'([$¥€£])')
+
+# Excel serial dates count days from 1899-12-30
+_EXCEL_EPOCH = datetime(1899, 12, 30)
+# Whole-day serials pd.Timedelta can represent; others go through it as before
+_MIN_SERIAL_DAY = pd.Timedelta.min.days + 1
+_MAX_SERIAL_DAY = pd.Timedelta.max.days
+
 
 class ExcelFormatter:
     """Format values according to Excel number format strings."""
@@ -27,43 +38,68 @@ class ExcelFormatter:
         if value is None:
             return ""
         
-        # Handle common formats
+        # The bulk of cells are General; skip the dispatch lookup for them
         if format_string == "General" or not format_string:
             return str(value)
         
+        format_fn = ExcelFormatter.formatter_for(format_string)
+        if format_fn is None:
+            return str(value)
+        return format_fn(value, format_string)
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def formatter_for(format_string: str) -> Optional[Callable[[Any, str], str]]:
+        """
+        Pick the formatting function for an Excel format string.
+        
+        The choice only depends on the format string, so it is cached; a
+        workbook only uses a handful of formats.
+        
+        Args:
+            format_string: Excel format string
+            
+        Returns:
+            Function called as fn(value, format_string), or None for formats
+            that leave values as str(value) (General, text, plain numbers)
+        """
+        # Handle common formats
+        if format_string == "General" or not format_string:
+            return None
+        
         # Currency formats
         if "$" in format_string or "¥" in format_string or "€" in format_string:
-            return ExcelFormatter._format_currency(value, format_string)
+            return ExcelFormatter._format_currency
         
         # Percentage formats
         if "%" in format_string:
-            return ExcelFormatter._format_percentage(value, format_string)
+            return ExcelFormatter._format_percentage
         
         # Date/time formats
         if any(x in format_string.upper() for x in ["Y", "M", "D", "H", "S"]):
-            return ExcelFormatter._format_datetime(value, format_string)
+            return ExcelFormatter._format_datetime
         
         # Number formats with thousand separators
         if "#,##" in format_string:
-            return ExcelFormatter._format_number_with_separator(value, format_string)
+            return ExcelFormatter._format_number_with_separator
         
         # Fraction formats
         if "/" in format_string and "?" in format_string:
-            return ExcelFormatter._format_fraction(value, format_string)
+            return ExcelFormatter._format_fraction
         
         # Default to string representation
-        return str(value)
+        return None
     
     @staticmethod
     def _format_currency(value: Any, format_string: str) -> str:
         """Format as currency."""
         try:
             # Extract currency symbol
-            currency_match = re.search(r'([$¥€£])', format_string)
+            currency_match = _CURRENCY_RE.search(format_string)
             currency = currency_match.group(1) if currency_match else "$"
             
             # Extract decimal places
-            decimal_match = re.search(r'\.(\d+)', format_string)
+            decimal_match = _DECIMALS_RE.search(format_string)
             decimals = len(decimal_match.group(1)) if decimal_match else 2
             
             # Format the number
@@ -87,7 +123,7 @@ class ExcelFormatter:
         """Format as percentage."""
         try:
             # Extract decimal places
-            decimal_match = re.search(r'\.(\d+)', format_string)
+            decimal_match = _DECIMALS_RE.search(format_string)
             decimals = len(decimal_match.group(1)) if decimal_match else 0
             
             num_value = float(value) * 100
@@ -102,38 +138,47 @@ class ExcelFormatter:
         try:
             # Convert Excel date number to datetime if needed
             if isinstance(value, (int, float)):
-                # Excel epoch starts from 1899-12-30
-                excel_epoch = datetime(1899, 12, 30)
-                value = excel_epoch + pd.Timedelta(days=value)
+                # Whole days (plain dates) need no sub-second arithmetic
+                if _MIN_SERIAL_DAY <= value <= _MAX_SERIAL_DAY and value == int(value) and not isinstance(value, bool):
+                    value = _EXCEL_EPOCH + timedelta(days=int(value))
+                else:
+                    value = _EXCEL_EPOCH + pd.Timedelta(days=value)
             
             if not isinstance(value, (datetime, date)):
                 return str(value)
             
             # Convert Excel format to Python format
-            format_map = {
-                'yyyy': '%Y', 'yy': '%y',
-                'mmmm': '%B', 'mmm': '%b', 'mm': '%m', 'm': '%-m',
-                'dddd': '%A', 'ddd': '%a', 'dd': '%d', 'd': '%-d',
-                'hh': '%H', 'h': '%-H',
-                'mm': '%M', 'm': '%-M',
-                'ss': '%S', 's': '%-S'
-            }
-            
-            py_format = format_string
-            for excel, python in sorted(format_map.items(), key=lambda x: -len(x[0])):
-                py_format = py_format.replace(excel, python)
+            py_format = ExcelFormatter._strftime_format(format_string)
             
             return value.strftime(py_format)
             
         except Exception:
             return str(value)
     
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _strftime_format(format_string: str) -> str:
+        """Translate an Excel date/time format into a strftime format (cached per format)."""
+        format_map = {
+            'yyyy': '%Y', 'yy': '%y',
+            'mmmm': '%B', 'mmm': '%b', 'mm': '%m', 'm': '%-m',
+            'dddd': '%A', 'ddd': '%a', 'dd': '%d', 'd': '%-d',
+            'hh': '%H', 'h': '%-H',
+            'mm': '%M', 'm': '%-M',
+            'ss': '%S', 's': '%-S'
+        }
+        
+        py_format = format_string
+        for excel, python in sorted(format_map.items(), key=lambda x: -len(x[0])):
+            py_format = py_format.replace(excel, python)
+        return py_format
+    
     @staticmethod
     def _format_number_with_separator(value: Any, format_string: str) -> str:
         """Format number with thousand separators."""
         try:
             # Extract decimal places
-            decimal_match = re.search(r'\.(\d+)', format_string)
+            decimal_match = _DECIMALS_RE.search(format_string)
             decimals = len(decimal_match.group(1)) if decimal_match else 0
             
             num_value = float(value)
@@ -0,0 +1,91 @@
+"""
+Helpers for parsing flagged CSV output back into values and flags.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+
+# Compiled once per process so callers scanning many cells don't pay for
+# re's pattern cache lookup on every call.
+COLOR_RE = re.compile(r'\{(?:bc:)?#([0-9A-Fa-f]{6})\}')
+MERGE_RE = re.compile(r'\{MG:(\d{6})\}')
+FLAG_RE = re.compile(r'\{[^}]+\}')
+FLAGS_RE = re.compile(r'\{(?:(?:bc:)?#(?P<color>[0-9A-Fa-f]{6})|MG:(?P<mg>\d{6})|[^}]+)\}')
+
+
+def parse_cell(cell: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    Split a flagged cell into its clean value, background color and merge ID.
+    
+    All flags are found in a single scan; the clean value is rebuilt from the
+    text between the matches rather than with a second substitution pass.
+    
+    Args:
+        cell: Cell text as produced by the converter, e.g. '$500{#FF0000}{MG:123456}'
+        
+    Returns:
+        Tuple of (clean_value, color, merge_id). color is '#RRGGBB' and
+        merge_id the 6-digit ID, or None when the flag is absent.
+    """
+    color = None
+    merge_id = None
+    parts = []
+    last = 0
+    for match in FLAGS_RE.finditer(cell):
+        parts.append(cell[last:match.start()])
+        last = match.end()
+        if color is None and match.group('color'):
+            color = f"#{match.group('color')}"
+        elif merge_id is None and match.group('mg'):
+            merge_id = match.group('mg')
+    
+    if not last:
+        return cell, None, None
+    
+    parts.append(cell[last:])
+    return ''.join(parts), color, merge_id
+
+
+def strip_flags(text: str) -> str:
+    """
+    Remove every {...} flag from a cell, keeping only its value.
+    
+    Equivalent to FLAG_RE.sub('', text). Most cells of a flagged CSV carry no
+    flags at all, so those are recognized with a single C-level scan for '{'
+    and returned as is; only flagged cells go through the regex.
+    
+    Args:
+        text: Cell text, e.g. '$500{#FF0000}{MG:123456}'
+        
+    Returns:
+        The text with all flags removed, e.g. '$500'
+    """
+    if '{' not in text:
+        return text
+    return FLAG_RE.sub('', text)
+
+
+def scan_flags(text: str) -> List[Tuple[str, int, int]]:
+    """
+    Find every color and merge flag in a whole flagged CSV document.
+    
+    The document is scanned once as a single buffer, so callers can locate
+    flags (and map them back to rows via the offsets) without splitting it
+    into cells and searching each one.
+    
+    Args:
+        text: Flagged CSV content
+        
+    Returns:
+        List of (kind, start, end) tuples in document order, where kind is
+        'color' or 'merge' and start/end are offsets into text.
+    """
+    found = []
+    for match in FLAGS_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == 'color':
+            found.append(('color', match.start(), match.end()))
+        elif kind == 'mg':
+            found.append(('merge', match.start(), match.end()))
+    return found
@@ -0,0 +1,16 @@
+"""
+Shared fixtures for the flagged-csv tests.
+"""
+
+import pytest
+
+from flagged_csv import XlsxConverter
+
+
+@pytest.fixture(scope="session")
+def default_converter():
+    """A default-config XlsxConverter shared by tests that need nothing else.
+    
+    Session scoped, so each pytest-xdist worker builds its own.
+    """
+    return XlsxConverter()
@@ -0,0 +1,126 @@
+"""
+Tests for the flagged-csv command-line interface.
+"""
+
+import subprocess
+import sys
+
+import pytest
+from pathlib import Path
+from click.testing import CliRunner
+from openpyxl import Workbook
+
+from flagged_csv.cli import main
+
+
+def create_multi_sheet_excel(file_path: Path):
+    """Create a test Excel file with several sheets."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "First"
+    ws['A1'] = 'first sheet'
+    
+    for name in ("Second", "Third"):
+        wb.create_sheet(name)['A1'] = f'{name.lower()} sheet'
+    
+    wb.save(file_path)
+
+
+class TestCli:
+    """Test the command-line interface."""
+    
+    def test_single_sheet(self, tmp_path):
+        """Test converting one sheet to stdout."""
+        xlsx_path = tmp_path / "multi.xlsx"
+        create_multi_sheet_excel(xlsx_path)
+        
+        result = CliRunner().invoke(main, [str(xlsx_path), '-t', 'Second', '--no-header'])
+        
+        assert result.exit_code == 0
+        assert result.output == 'second sheet\n'
+    
+    def test_output_file(self, tmp_path):
+        """Test converting one sheet to an output file."""
+        xlsx_path = tmp_path / "multi.xlsx"
+        create_multi_sheet_excel(xlsx_path)
+        output = tmp_path / "out.csv"
+        
+        result = CliRunner().invoke(main, [str(xlsx_path), '-t', 'First', '-o', str(output), '--no-header'])
+        
+        assert result.exit_code == 0
+        assert output.read_text() == 'first sheet\n'
+    
+    def test_failed_conversion_keeps_output(self, tmp_path):
+        """Test that an existing output file is left alone when the conversion fails."""
+        xlsx_path = tmp_path / "multi.xlsx"
+        create_multi_sheet_excel(xlsx_path)
+        output = tmp_path / "out.csv"
+        output.write_text('kept\n')
+        
+        result = CliRunner().invoke(main, [str(xlsx_path), '-t', 'NoSuch', '-o', str(output)])
+        
+        assert result.exit_code != 0
+        assert 'not found' in result.output
+        assert output.read_text() == 'kept\n'
+    
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_all_sheets(self, tmp_path, jobs):
+        """Test converting every sheet into one file per sheet."""
+        xlsx_path = tmp_path / "multi.xlsx"
+        create_multi_sheet_excel(xlsx_path)
+        
+        output = str(tmp_path / "{sheet}.csv")
+        result = CliRunner().invoke(main, [str(xlsx_path), '--sheets', '*', '-j', jobs, '-o', output, '--no-header'])
+        
+        assert result.exit_code == 0
+        for name in ("First", "Second", "Third"):
+            assert (tmp_path / f"{name}.csv").read_text() == f'{name.lower()} sheet\n'
+    
+    @pytest.mark.parametrize("jobs", ["0", "-2"])
+    def test_jobs_must_be_positive(self, tmp_path, jobs):
+        """Test that a worker count below one is a usage error."""
+        xlsx_path = tmp_path / "multi.xlsx"
+        create_multi_sheet_excel(xlsx_path)
+        
+        result = CliRunner().invoke(main, [str(xlsx_path), '--sheets', '*', '-j', jobs, '-o', str(tmp_path / "{sheet}.csv")])
+        
+        assert result.exit_code == 2
+        assert "Invalid value for '-j' / '--jobs'" in result.output
+    
+    def test_cache_is_opt_in(self, tmp_path, monkeypatch):
+        """Test that parsed sheets are only cached on disk with --cache."""
+        xlsx_path = tmp_path / "multi.xlsx"
+        create_multi_sheet_excel(xlsx_path)
+        monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / "cache"))
+        cache_dir = tmp_path / "cache" / "flagged-csv"
+        args = [str(xlsx_path), '-t', 'First', '--include-colors', '--no-header']
+        
+        assert CliRunner().invoke(main, args).exit_code == 0
+        assert not cache_dir.exists()
+        
+        assert CliRunner().invoke(main, args + ['--cache']).exit_code == 0
+        assert len(list(cache_dir.glob('*.pkl'))) == 1
+    
+    def test_sheets_requires_template(self, tmp_path):
+        """Test that several sheets can't be written to a single output."""
+        xlsx_path = tmp_path / "multi.xlsx"
+        create_multi_sheet_excel(xlsx_path)
+        
+        result = CliRunner().invoke(main, [str(xlsx_path), '--sheets', 'First,Second'])
+        
+        assert result.exit_code != 0
+        assert '{sheet}' in result.output
+    
+    def test_import_is_lightweight(self):
+        """Test that importing the package and CLI doesn't load pandas or openpyxl."""
+        code = (
+            "import sys, flagged_csv, flagged_csv.cli; "
+            "print(sorted(m for m in ('pandas', 'openpyxl') if m in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        
+        assert result.stdout.strip() == '[]'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
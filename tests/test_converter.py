@@ -2,466 +2,781 @@
 Tests for the flagged-csv converter.
 """
 
-import pytest
+import hashlib
+import inspect
+import io
+import os
+import re
+import shutil
 import tempfile
+import pandas as pd
+import openpyxl
+import pytest
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Color, PatternFill, Font
 
 from flagged_csv import XlsxConverter, XlsxConverterConfig
 
 
-def create_test_excel(file_path: Path, with_colors=False, with_merge=False):
-    """Create a test Excel file."""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "TestSheet"
-    
-    # Add some data
-    ws['A1'] = 'Header1'
-    ws['B1'] = 'Header2'
-    ws['C1'] = 'Header3'
-    
-    ws['A2'] = 'Value1'
-    ws['B2'] = 100
-    ws['C2'] = 200.50
+def _make_wb(title: str = 'Sheet'):
+    """Create a write-only workbook with one sheet, filled row by row with ws.append()."""
+    wb = Workbook(write_only=True)
+    return wb, wb.create_sheet(title)
+
+
+def _cell(ws, value, fill=None, font=None):
+    """Build a styled cell for a write-only sheet."""
+    cell = WriteOnlyCell(ws, value=value)
+    if fill is not None:
+        cell.fill = fill
+    if font is not None:
+        cell.font = font
+    return cell
+
+
+@lru_cache(maxsize=None)
+def _solid(color: str) -> PatternFill:
+    """Solid background fill of the given RRGGBB color, shared by every cell using it."""
+    return PatternFill(start_color=color, end_color=color, fill_type='solid')
+
+
+@lru_cache(maxsize=None)
+def _font(color: str) -> Font:
+    """Font of the given RRGGBB color, shared by every cell using it."""
+    return Font(color=color)
+
+
+def _build_test_excel(file_path: Path, with_colors: bool, with_merge: bool):
+    """Build the workbook create_test_excel() hands out."""
+    wb, ws = _make_wb("TestSheet")
     
-    # Add colors if requested
-    if with_colors:
-        ws['A1'].fill = PatternFill(start_color='FF0000', end_color='FF0000', fill_type='solid')
-        ws['B2'].fill = PatternFill(start_color='00FF00', end_color='00FF00', fill_type='solid')
+    # Add some data, with colors if requested
+    header = [_cell(ws, 'Header1', fill=_solid('FF0000') if with_colors else None), 'Header2', 'Header3']
+    values = ['Value1', _cell(ws, 100, fill=_solid('00FF00') if with_colors else None), 200.50]
     
     # Add merge if requested
     if with_merge:
-        ws['D1'] = 'Merged Cell'
-        ws.merge_cells('D1:F1')
+        header.append('Merged Cell')
+        ws.merged_cells.add('D1:F1')
     
+    ws.append(header)
+    ws.append(values)
     wb.save(file_path)
-    return wb
+
+
+# Built workbooks are kept between test runs until their builders or openpyxl change
+_FIXTURE_CACHE = Path(tempfile.gettempdir()) / "flagged_csv_fixtures" / hashlib.sha1(
+    "".join(inspect.getsource(fn) for fn in (_make_wb, _cell, _solid, _build_test_excel)).encode()
+    + openpyxl.__version__.encode()
+).hexdigest()[:12]
+
+
+def create_test_excel(file_path: Path, with_colors=False, with_merge=False):
+    """Create a test Excel file, copied from a build cached across test runs."""
+    cached = _FIXTURE_CACHE / f"test_{int(with_colors)}{int(with_merge)}.xlsx"
+    if not cached.exists():
+        _FIXTURE_CACHE.mkdir(parents=True, exist_ok=True)
+        # Built under a per-process name, so parallel workers never see a partial file
+        partial = cached.with_name(f"{cached.name}.{os.getpid()}")
+        _build_test_excel(partial, with_colors, with_merge)
+        os.replace(partial, cached)
+    shutil.copyfile(cached, file_path)
+
+
+@pytest.fixture(scope="module")
+def basic_xlsx(tmp_path_factory):
+    """Path of a create_test_excel() workbook, built once for the module."""
+    xlsx_path = tmp_path_factory.mktemp("xlsx") / "test.xlsx"
+    create_test_excel(xlsx_path)
+    return str(xlsx_path)
+
+
+@pytest.fixture(scope="module")
+def colors_xlsx(tmp_path_factory):
+    """Path of a create_test_excel() workbook with colored cells."""
+    xlsx_path = tmp_path_factory.mktemp("xlsx") / "test_colors.xlsx"
+    create_test_excel(xlsx_path, with_colors=True)
+    return str(xlsx_path)
+
+
+@pytest.fixture(scope="module")
+def merge_xlsx(tmp_path_factory):
+    """Path of a create_test_excel() workbook with a merged range."""
+    xlsx_path = tmp_path_factory.mktemp("xlsx") / "test_merge.xlsx"
+    create_test_excel(xlsx_path, with_merge=True)
+    return str(xlsx_path)
+
+
+@pytest.fixture(scope="module")
+def ignore_xlsx(tmp_path_factory):
+    """Path of a workbook for the ignore-list tests: default colors next to custom ones."""
+    xlsx_path = tmp_path_factory.mktemp("xlsx") / "test_ignore.xlsx"
+    wb, ws = _make_wb()
+    ws.append([
+        # White background with black text (should be ignored by default)
+        _cell(ws, 'Normal', fill=_solid('FFFFFF'), font=_font('000000')),
+        # Colored background with colored text
+        _cell(ws, 'Colored', fill=_solid('FF0000'), font=_font('00FF00')),
+    ])
+    wb.save(xlsx_path)
+    return str(xlsx_path)
 
 
 class TestXlsxConverter:
     """Test the XLSX converter functionality."""
     
-    def test_basic_conversion(self):
+    def test_basic_conversion(self, basic_xlsx, default_converter):
         """Test basic XLSX to CSV conversion."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create test file
-            xlsx_path = Path(temp_dir) / "test.xlsx"
-            create_test_excel(xlsx_path)
-            
-            # Convert
-            converter = XlsxConverter()
-            result = converter.convert_to_csv(str(xlsx_path), 'TestSheet')
-            
-            # Check result
-            assert 'Header1' in result
-            assert 'Value1' in result
-            assert '100' in result
+        # Convert
+        result = default_converter.convert_to_csv(basic_xlsx, 'TestSheet')
+        
+        # Check result
+        assert 'Header1' in result
+        assert 'Value1' in result
+        assert '100' in result
     
-    def test_color_extraction(self):
+    def test_color_extraction(self, colors_xlsx, default_converter):
         """Test color flag extraction."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create test file with colors
-            xlsx_path = Path(temp_dir) / "test_colors.xlsx"
-            create_test_excel(xlsx_path, with_colors=True)
-            
-            # Convert with colors
-            converter = XlsxConverter()
-            result = converter.convert_to_csv(
-                str(xlsx_path), 
-                'TestSheet',
-                include_colors=True
-            )
-            
-            # Check for color flags
-            assert '{#FF0000}' in result  # Red color
-            assert '{#00FF00}' in result  # Green color
+        # Convert with colors
+        result = default_converter.convert_to_csv(
+            colors_xlsx, 
+            'TestSheet',
+            include_colors=True
+        )
+        
+        # Check for color flags: red and green
+        assert {'FF0000', '00FF00'} <= set(re.findall(r'\{#([0-9A-F]{6})\}', result))
     
-    def test_merge_detection(self):
+    def test_merge_detection(self, merge_xlsx, default_converter):
         """Test merge cell detection."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create test file with merged cells
-            xlsx_path = Path(temp_dir) / "test_merge.xlsx"
-            create_test_excel(xlsx_path, with_merge=True)
-            
-            # Convert with merge detection
-            converter = XlsxConverter()
-            result = converter.convert_to_csv(
-                str(xlsx_path),
-                'TestSheet',
-                signal_merge=True
-            )
-            
-            # Check for merge flags
-            assert '{MG:' in result
-            assert 'Merged Cell' in result
+        # Convert with merge detection
+        result = default_converter.convert_to_csv(
+            merge_xlsx,
+            'TestSheet',
+            signal_merge=True
+        )
+        
+        # Check for merge flags
+        assert '{MG:' in result
+        assert 'Merged Cell' in result
+    
+    def test_merge_ids_unique(self, tmp_path):
+        """Test that every merged range gets its own six-digit ID."""
+        xlsx_path = tmp_path / "test_merge_ids.xlsx"
+        wb = Workbook()
+        ws = wb.active
+        for row in range(1, 200, 2):
+            ws.cell(row=row, column=1, value=f'Merge {row}')
+            ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=2)
+        wb.save(xlsx_path)
+        
+        result = XlsxConverter().convert_to_csv(str(xlsx_path), 'Sheet', signal_merge=True)
+        ids = re.findall(r'\{MG:(\d+)\}', result)
+        assert len(ids) == 200
+        assert all(len(merge_id) == 6 for merge_id in ids)
+        assert len(set(ids)) == 100
     
-    def test_ignore_colors(self):
+    def test_ignore_colors(self, tmp_path, default_converter):
         """Test ignoring specific colors."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create test file
-            xlsx_path = Path(temp_dir) / "test_ignore.xlsx"
-            wb = Workbook()
-            ws = wb.active
-            
-            ws['A1'] = 'White BG'
-            ws['A1'].fill = PatternFill(start_color='FFFFFF', end_color='FFFFFF', fill_type='solid')
-            
-            ws['B1'] = 'Red BG'
-            ws['B1'].fill = PatternFill(start_color='FF0000', end_color='FF0000', fill_type='solid')
-            
-            wb.save(xlsx_path)
-            
-            # Convert ignoring white
-            converter = XlsxConverter()
-            result = converter.convert_to_csv(
-                str(xlsx_path),
-                'Sheet',
-                include_colors=True,
-                ignore_colors='#FFFFFF'
-            )
-            
-            # White should be ignored, red should be included
-            assert '{#FFFFFF}' not in result
-            assert '{#FF0000}' in result
+        # Create test file
+        xlsx_path = tmp_path / "test_ignore.xlsx"
+        wb, ws = _make_wb()
+        ws.append([
+            _cell(ws, 'White BG', fill=_solid('FFFFFF')),
+            _cell(ws, 'Red BG', fill=_solid('FF0000')),
+        ])
+        wb.save(xlsx_path)
+        
+        # Convert ignoring white
+        result = default_converter.convert_to_csv(
+            str(xlsx_path),
+            'Sheet',
+            include_colors=True,
+            ignore_colors='#FFFFFF'
+        )
+        
+        # White should be ignored, red should be included
+        assert '{#FFFFFF}' not in result
+        assert '{#FF0000}' in result
     
-    def test_invalid_sheet_name(self):
+    def test_invalid_sheet_name(self, basic_xlsx, default_converter):
         """Test error handling for invalid sheet names."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create test file
-            xlsx_path = Path(temp_dir) / "test.xlsx"
-            create_test_excel(xlsx_path)
-            
-            # Try to convert non-existent sheet
-            converter = XlsxConverter()
-            with pytest.raises(ValueError, match="Sheet 'InvalidSheet' not found"):
-                converter.convert_to_csv(str(xlsx_path), 'InvalidSheet')
+        # Try to convert non-existent sheet
+        with pytest.raises(ValueError, match="Sheet 'InvalidSheet' not found"):
+            default_converter.convert_to_csv(basic_xlsx, 'InvalidSheet')
     
-    def test_file_not_found(self):
+    def test_file_not_found(self, tmp_path, default_converter):
         """Test error handling for missing files."""
-        converter = XlsxConverter()
         with pytest.raises(FileNotFoundError):
-            converter.convert_to_csv('/nonexistent/file.xlsx', 'Sheet1')
+            default_converter.convert_to_csv('/nonexistent/file.xlsx', 'Sheet1')
+        
+        # A directory is rejected before any reader engine is tried
+        (tmp_path / "folder.xlsx").mkdir()
+        with pytest.raises(FileNotFoundError):
+            default_converter.convert_to_csv(str(tmp_path / "folder.xlsx"), 'Sheet1')
     
-    def test_configuration(self):
+    def test_configuration(self, basic_xlsx):
         """Test converter configuration options."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create test file
-            xlsx_path = Path(temp_dir) / "test.xlsx"
-            create_test_excel(xlsx_path)
-            
-            # Test with header=False (default)
-            config = XlsxConverterConfig(
-                header=False,
-                keep_default_na=True
-            )
-            converter = XlsxConverter(config)
-            result = converter.convert_to_csv(str(xlsx_path), 'TestSheet')
-            
-            # When header=False, we should not output DataFrame column headers (A, B, C)
-            # but we should still include all rows of data
-            lines = result.strip().split('\n')
-            assert len(lines) == 2  # Both rows of data
-            assert 'Header1' in lines[0]
-            assert 'Value1' in lines[1]
-            
-            # Test with header=True
-            config_with_header = XlsxConverterConfig(
-                header=True,
-                keep_default_na=True
-            )
-            converter_with_header = XlsxConverter(config_with_header)
-            result_with_header = converter_with_header.convert_to_csv(str(xlsx_path), 'TestSheet')
-            
-            # When header=True, we should output DataFrame column headers (A, B, C)
-            lines_with_header = result_with_header.strip().split('\n')
-            assert len(lines_with_header) == 3  # Column headers + 2 data rows
-            assert 'A,B,C' in lines_with_header[0]
-            assert 'Header1' in lines_with_header[1]
+        # Test with header=False (default)
+        config = XlsxConverterConfig(
+            header=False,
+            keep_default_na=True
+        )
+        converter = XlsxConverter(config)
+        result = converter.convert_to_csv(basic_xlsx, 'TestSheet')
+        
+        # When header=False, we should not output DataFrame column headers (A, B, C)
+        # but we should still include all rows of data
+        lines = result.splitlines()
+        assert len(lines) == 2  # Both rows of data
+        assert 'Header1' in lines[0]
+        assert 'Value1' in lines[1]
+        
+        # Test with header=True
+        config_with_header = XlsxConverterConfig(
+            header=True,
+            keep_default_na=True
+        )
+        converter_with_header = XlsxConverter(config_with_header)
+        result_with_header = converter_with_header.convert_to_csv(basic_xlsx, 'TestSheet')
+        
+        # When header=True, we should output DataFrame column headers (A, B, C)
+        lines_with_header = result_with_header.splitlines()
+        assert len(lines_with_header) == 3  # Column headers + 2 data rows
+        assert 'A,B,C' in lines_with_header[0]
+        assert 'Header1' in lines_with_header[1]
     
-    def test_output_formats(self):
+    def test_output_formats(self, basic_xlsx, default_converter):
         """Test different output formats."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create test file
-            xlsx_path = Path(temp_dir) / "test.xlsx"
-            create_test_excel(xlsx_path)
-            
-            converter = XlsxConverter()
-            
-            # Test HTML output
-            html_result = converter.convert_to_csv(
-                str(xlsx_path),
-                'TestSheet',
-                output_format='html'
-            )
-            assert '<table' in html_result
-            assert 'Header1' in html_result  # Header is in <th> not <td>
-            assert '<td>Value1</td>' in html_result
-            
-            # Test Markdown output
-            md_result = converter.convert_to_csv(
-                str(xlsx_path),
-                'TestSheet',
-                output_format='markdown'
-            )
-            assert '|' in md_result  # Markdown tables use pipes
+        # Test HTML output
+        html_result = default_converter.convert_to_csv(
+            basic_xlsx,
+            'TestSheet',
+            output_format='html'
+        )
+        assert '<table' in html_result
+        assert 'Header1' in html_result  # Header is in <th> not <td>
+        assert '<td>Value1</td>' in html_result
+        
+        # Test Markdown output
+        md_result = default_converter.convert_to_csv(
+            basic_xlsx,
+            'TestSheet',
+            output_format='markdown'
+        )
+        assert '|' in md_result  # Markdown tables use pipes
     
-    def test_add_location(self):
+    def test_add_location(self, tmp_path, default_converter):
         """Test adding location coordinates to cells."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create test file
-            xlsx_path = Path(temp_dir) / "test_location.xlsx"
-            wb = Workbook()
-            ws = wb.active
-            ws['A1'] = 'Header1'
-            ws['B1'] = 'Header2'
-            ws['A2'] = 'Value1'
-            ws['B2'] = 100
-            wb.save(xlsx_path)
-            
-            # Convert with location tags
-            converter = XlsxConverter()
-            result = converter.convert_to_csv(
-                str(xlsx_path),
-                'Sheet',
-                add_location=True
-            )
-            
-            # Check for location tags
-            assert '{l:A1}' in result
-            assert '{l:B1}' in result
-            assert '{l:A2}' in result
-            assert '{l:B2}' in result
+        # Create test file
+        xlsx_path = tmp_path / "test_location.xlsx"
+        wb, ws = _make_wb()
+        ws.append(['Header1', 'Header2'])
+        ws.append(['Value1', 100])
+        wb.save(xlsx_path)
+        
+        # Convert with location tags
+        result = default_converter.convert_to_csv(
+            str(xlsx_path),
+            'Sheet',
+            add_location=True
+        )
+        
+        # Check for location tags
+        assert {'A1', 'B1', 'A2', 'B2'} <= set(re.findall(r'\{l:([A-Z]+\d+)\}', result))
     
-    def test_keep_empty_lines(self):
+    def test_keep_empty_lines(self, tmp_path, default_converter):
         """Test keeping empty rows."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create test file with empty rows
-            xlsx_path = Path(temp_dir) / "test_empty.xlsx"
-            wb = Workbook()
-            ws = wb.active
-            ws['A1'] = 'Row1'
-            # Row 2 is empty
-            ws['A3'] = 'Row3'
-            # Row 4 is empty
-            ws['A5'] = 'Row5'
-            wb.save(xlsx_path)
-            
-            # Convert without keep_empty_lines (default)
-            converter = XlsxConverter()
-            result_no_empty = converter.convert_to_csv(str(xlsx_path), 'Sheet')
-            lines_no_empty = result_no_empty.strip().split('\n')
-            # Should have 3 data rows (no empty lines)
-            assert len(lines_no_empty) == 3
-            
-            # Convert with keep_empty_lines
-            result_with_empty = converter.convert_to_csv(
-                str(xlsx_path), 'Sheet',
-                keep_empty_lines=True
-            )
-            lines_with_empty = result_with_empty.strip().split('\n')
-            # Should have 5 rows (including empty lines)
-            assert len(lines_with_empty) == 5
+        # Create test file with empty rows
+        xlsx_path = tmp_path / "test_empty.xlsx"
+        wb, ws = _make_wb()
+        ws.append(['Row1'])
+        ws.append([])  # Row 2 is empty
+        ws.append(['Row3'])
+        ws.append([])  # Row 4 is empty
+        ws.append(['Row5'])
+        wb.save(xlsx_path)
+        
+        # Convert without keep_empty_lines (default)
+        result_no_empty = default_converter.convert_to_csv(str(xlsx_path), 'Sheet')
+        lines_no_empty = result_no_empty.splitlines()
+        # Should have 3 data rows (no empty lines)
+        assert len(lines_no_empty) == 3
+        
+        # Convert with keep_empty_lines
+        result_with_empty = default_converter.convert_to_csv(
+            str(xlsx_path), 'Sheet',
+            keep_empty_lines=True
+        )
+        lines_with_empty = result_with_empty.splitlines()
+        # Should have 5 rows (including empty lines)
+        assert len(lines_with_empty) == 5
     
-    def test_black_text_contrast(self):
+    @pytest.mark.parametrize("read_only", [True, False])
+    def test_keep_empty_lines_empty_sheet(self, tmp_path, read_only):
+        """Test that an empty sheet keeps its max_columns columns with keep_empty_lines."""
+        xlsx_path = tmp_path / "test_empty_sheet.xlsx"
+        Workbook().save(xlsx_path)
+        
+        converter = XlsxConverter(XlsxConverterConfig(header=True, read_only=read_only))
+        result = converter.convert_to_csv(str(xlsx_path), 'Sheet', keep_empty_lines=True, max_columns=5)
+        assert result == 'A,B,C,D,E\n'
+    
+    def test_black_text_contrast(self, tmp_path, default_converter):
         """Test that black text is only included when there's a background color for contrast."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create test file with various text/background combinations
-            xlsx_path = Path(temp_dir) / "test_contrast.xlsx"
-            wb = Workbook()
-            ws = wb.active
-            
+        # Create test file with various text/background combinations
+        xlsx_path = tmp_path / "test_contrast.xlsx"
+        wb, ws = _make_wb()
+        ws.append([
             # White text on dark background
-            ws['A1'] = 'White on Dark'
-            ws['A1'].font = Font(color='FFFFFF')
-            ws['A1'].fill = PatternFill(start_color='8E1C02', end_color='8E1C02', fill_type='solid')
-            
+            _cell(ws, 'White on Dark', fill=_solid('8E1C02'), font=_font('FFFFFF')),
             # Black text on light background
-            ws['B1'] = 'Black on Light'
-            ws['B1'].font = Font(color='000000')
-            ws['B1'].fill = PatternFill(start_color='FFFF00', end_color='FFFF00', fill_type='solid')
-            
+            _cell(ws, 'Black on Light', fill=_solid('FFFF00'), font=_font('000000')),
+        ])
+        ws.append([
             # Black text with no background (should NOT include fc:#000000)
-            ws['A2'] = 'Plain Black'
-            ws['A2'].font = Font(color='000000')
-            
+            _cell(ws, 'Plain Black', font=_font('000000')),
             # Colored text with no background (should include the color)
-            ws['B2'] = 'Red Text'
-            ws['B2'].font = Font(color='FF0000')
-            
-            wb.save(xlsx_path)
-            
-            # Test 1: With default ignore lists (black fg ignored by default)
-            converter = XlsxConverter()
-            result = converter.convert_to_csv(
-                str(xlsx_path),
-                'Sheet',
-                include_colors=True  # Include both fg and bg
-            )
-            
-            lines = result.strip().split('\n')
-            
-            # Check white on dark background
-            assert '{#8E1C02}' in lines[0]  # Dark background
-            assert '{fc:#FFFFFF}' in lines[0]  # White text
-            
-            # Check black on light background (black text is ignored by default)
-            assert '{#FFFF00}' in lines[0]  # Yellow background
-            assert '{fc:#000000}' not in lines[0]  # Black text ignored by default
-            
-            # Check plain black text (no background)
-            assert 'Plain Black' in lines[1]
-            assert '{fc:#000000}' not in lines[1]  # Black text ignored by default
-            
-            # Check colored text (no background)
-            assert 'Red Text' in lines[1]
-            assert '{fc:#FF0000}' in lines[1]  # Red text should be included
-            
-            # Test 2: Without ignoring black text (to test contrast logic)
-            result2 = converter.convert_to_csv(
-                str(xlsx_path),
-                'Sheet',
-                include_colors=True,
-                ignore_fg_colors=''  # Don't ignore any foreground colors
-            )
-            
-            lines2 = result2.strip().split('\n')
-            
-            # Now black text on background should be included
-            assert '{#FFFF00}' in lines2[0]  # Yellow background
-            assert '{fc:#000000}' in lines2[0]  # Black text now included with background
-            
-            # Plain black text (no background) should still not be included due to contrast logic
-            assert 'Plain Black' in lines2[1]
-            assert '{fc:#000000}' not in lines2[1]  # Black text without background still not included
+            _cell(ws, 'Red Text', font=_font('FF0000')),
+        ])
+        wb.save(xlsx_path)
+        
+        # Test 1: With default ignore lists (black fg ignored by default)
+        result = default_converter.convert_to_csv(
+            str(xlsx_path),
+            'Sheet',
+            include_colors=True  # Include both fg and bg
+        )
+        
+        lines = result.splitlines()
+        
+        # Check white on dark background
+        assert '{#8E1C02}' in lines[0]  # Dark background
+        assert '{fc:#FFFFFF}' in lines[0]  # White text
+        
+        # Check black on light background (black text is ignored by default)
+        assert '{#FFFF00}' in lines[0]  # Yellow background
+        assert '{fc:#000000}' not in lines[0]  # Black text ignored by default
+        
+        # Check plain black text (no background)
+        assert 'Plain Black' in lines[1]
+        assert '{fc:#000000}' not in lines[1]  # Black text ignored by default
+        
+        # Check colored text (no background)
+        assert 'Red Text' in lines[1]
+        assert '{fc:#FF0000}' in lines[1]  # Red text should be included
+        
+        # Test 2: Without ignoring black text (to test contrast logic)
+        result2 = default_converter.convert_to_csv(
+            str(xlsx_path),
+            'Sheet',
+            include_colors=True,
+            ignore_fg_colors=''  # Don't ignore any foreground colors
+        )
+        
+        lines2 = result2.splitlines()
+        
+        # Now black text on background should be included
+        assert '{#FFFF00}' in lines2[0]  # Yellow background
+        assert '{fc:#000000}' in lines2[0]  # Black text now included with background
+        
+        # Plain black text (no background) should still not be included due to contrast logic
+        assert 'Plain Black' in lines2[1]
+        assert '{fc:#000000}' not in lines2[1]  # Black text without background still not included
     
-    def test_ignore_colors_defaults(self):
+    @pytest.mark.parametrize("options, expect_in, expect_out", [
+        # With defaults (ignore white bg and black fg): the colored cell keeps both
+        ({}, ['Normal,', '{#FF0000}', '{fc:#00FF00}'], ['{#FFFFFF}', '{fc:#000000}']),
+        # Override with empty ignore lists: white bg and black fg are included
+        ({'ignore_bg_colors': '', 'ignore_fg_colors': ''}, ['{#FFFFFF}', '{fc:#000000}'], []),
+        # Custom ignore lists: red bg and green fg are ignored, white bg and
+        # black fg (with background) are not
+        ({'ignore_bg_colors': '#FF0000', 'ignore_fg_colors': '#00FF00'},
+         ['{#FFFFFF}', '{fc:#000000}'], ['{#FF0000}', '{fc:#00FF00}']),
+    ])
+    def test_ignore_colors_defaults(self, ignore_xlsx, default_converter, options, expect_in, expect_out):
         """Test default ignore colors and custom ignore lists."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create test file with various color combinations
-            xlsx_path = Path(temp_dir) / "test_ignore.xlsx"
-            wb = Workbook()
-            ws = wb.active
-            
-            # White background with black text (should be ignored by default)
-            ws['A1'] = 'Normal'
-            ws['A1'].fill = PatternFill(start_color='FFFFFF', end_color='FFFFFF', fill_type='solid')
-            ws['A1'].font = Font(color='000000')
-            
-            # Colored background with colored text
-            ws['B1'] = 'Colored'
-            ws['B1'].fill = PatternFill(start_color='FF0000', end_color='FF0000', fill_type='solid')
-            ws['B1'].font = Font(color='00FF00')
-            
-            wb.save(xlsx_path)
-            
-            converter = XlsxConverter()
-            
-            # Test 1: With defaults (ignore white bg and black fg)
-            result = converter.convert_to_csv(
-                str(xlsx_path), 'Sheet',
-                include_colors=True  # Both fg and bg
-            )
-            lines = result.strip().split('\n')
-            # Normal cell should have no colors (white bg and black fg ignored)
-            assert 'Normal,' in lines[0] or ',Normal' in lines[0]
-            assert '{#FFFFFF}' not in lines[0]  # White bg ignored
-            assert '{fc:#000000}' not in lines[0]  # Black fg ignored
-            # Colored cell should have both colors
-            assert '{#FF0000}' in lines[0]  # Red bg included
-            assert '{fc:#00FF00}' in lines[0]  # Green fg included
-            
-            # Test 2: Override with empty ignore lists
-            result = converter.convert_to_csv(
-                str(xlsx_path), 'Sheet',
-                include_colors=True,
-                ignore_bg_colors='',  # Don't ignore any bg colors
-                ignore_fg_colors=''   # Don't ignore any fg colors
-            )
-            lines = result.strip().split('\n')
-            # Now white bg and black fg should be included
-            assert '{#FFFFFF}' in lines[0]  # White bg now included
-            assert '{fc:#000000}' in lines[0]  # Black fg now included
-            
-            # Test 3: Custom ignore lists
-            result = converter.convert_to_csv(
-                str(xlsx_path), 'Sheet',
-                include_colors=True,
-                ignore_bg_colors='#FF0000',  # Ignore red bg
-                ignore_fg_colors='#00FF00'   # Ignore green fg
-            )
-            lines = result.strip().split('\n')
-            # Red bg and green fg should be ignored
-            assert '{#FF0000}' not in lines[0]  # Red bg ignored
-            assert '{fc:#00FF00}' not in lines[0]  # Green fg ignored
-            # White bg and black fg should be included (not in ignore list)
-            assert '{#FFFFFF}' in lines[0]  # White bg included
-            assert '{fc:#000000}' in lines[0]  # Black fg included (with background)
-    
-    def test_indexed_colors(self):
+        result = default_converter.convert_to_csv(ignore_xlsx, 'Sheet', include_colors=True, **options)
+        first_line = result.splitlines()[0]
+        for flag in expect_in:
+            assert flag in first_line
+        for flag in expect_out:
+            assert flag not in first_line
+    
+    def test_indexed_colors(self, tmp_path):
         """Test that indexed colors are correctly mapped."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create test file with indexed colors
-            xlsx_path = Path(temp_dir) / "test_indexed.xlsx"
-            wb = Workbook()
-            ws = wb.active
-            
-            # Set cells with different indexed colors
-            ws['A1'] = 'Red Background'
-            ws['A1'].fill = PatternFill(patternType='solid', fgColor='00FF0000')  # Index 2 = Red
-            
-            ws['B1'] = 'Green Background'
-            ws['B1'].fill = PatternFill(patternType='solid', fgColor='0000FF00')  # Index 3 = Green
-            
-            wb.save(xlsx_path)
-            
-            # Convert with colors
-            converter = XlsxConverter()
-            result = converter.convert_to_csv(
-                str(xlsx_path),
-                'Sheet',
-                include_bg_colors=True,
-                ignore_bg_colors=''  # Don't ignore any colors for this test
-            )
-            
-            # Check that colors are extracted correctly
-            assert '{#FF0000}' in result  # Red
-            assert '{#00FF00}' in result  # Green
+        # Create test file with indexed colors
+        xlsx_path = tmp_path / "test_indexed.xlsx"
+        wb = Workbook()
+        ws = wb.active
+        
+        # Set cells with different indexed colors
+        ws['A1'] = 'Red Background'
+        ws['A1'].fill = PatternFill(patternType='solid', fgColor='00FF0000')  # Index 2 = Red
+        
+        ws['B1'] = 'Green Background'
+        ws['B1'].fill = PatternFill(patternType='solid', fgColor='0000FF00')  # Index 3 = Green
+        
+        wb.save(xlsx_path)
+        
+        # Convert with colors
+        converter = XlsxConverter()
+        result = converter.convert_to_csv(
+            str(xlsx_path),
+            'Sheet',
+            include_bg_colors=True,
+            ignore_bg_colors=''  # Don't ignore any colors for this test
+        )
+        
+        # Check that colors are extracted correctly
+        assert '{#FF0000}' in result  # Red
+        assert '{#00FF00}' in result  # Green
     
-    def test_max_rows_columns(self):
+    def test_openpyxl_patched_once(self):
+        """Test that building more converters does not re-wrap openpyxl's RGB setter."""
+        from openpyxl.styles.colors import RGB
+        
+        XlsxConverter()
+        setter = RGB.__set__
+        XlsxConverter()
+        assert RGB.__set__ is setter
+    
+    def test_theme_tint(self, tmp_path, monkeypatch):
+        """Test that tinted theme colors are lightened and darkened like Excel does."""
+        xlsx_path = tmp_path / "test_tint.xlsx"
+        wb = Workbook()
+        ws = wb.active
+        
+        # Theme 4 is accent1 (4F81BD in openpyxl's default theme)
+        ws['A1'] = 'Lighter'
+        ws['A1'].fill = PatternFill(patternType='solid', fgColor=Color(theme=4, tint=0.3999755851924192))
+        ws['A2'] = 'Darker'
+        ws['A2'].fill = PatternFill(patternType='solid', fgColor=Color(theme=4, tint=-0.249977111117893))
+        wb.save(xlsx_path)
+        
+        # The theme comes from the loaded workbook, without reopening the zip
+        monkeypatch.setattr('flagged_csv.converter.zipfile', None)
+        converter = XlsxConverter()
+        for _ in range(2):
+            result = converter.convert_to_csv(str(xlsx_path), 'Sheet', include_colors=True)
+            assert result.splitlines() == ['Lighter{#95B3D7}', 'Darker{#366092}']
+    
+    def test_empty_row_helpers(self):
+        """Test that NaN, empty and whitespace-only cells count as empty when trimming."""
+        converter = XlsxConverter()
+        df = pd.DataFrame([
+            ['a', None, '', None],
+            [None, '  ', float('nan'), None],
+            [None, 0, '', ''],
+            ['', ' ', None, None],
+        ])
+        
+        trimmed = converter._trim_trailing_empty_rows(df)
+        assert trimmed.shape == (3, 2)
+        assert list(converter._remove_empty_rows(df).index) == [0, 2]
+        assert converter._trim_trailing_empty_rows(df.iloc[[1, 3]]).empty
+    
+    def test_flag_only_columns_kept(self, tmp_path):
+        """Test that empty cells carrying only color or merge flags still widen the output."""
+        xlsx_path = tmp_path / "test_flag_columns.xlsx"
+        wb = Workbook()
+        ws = wb.active
+        ws['A1'] = 'Value'
+        ws['D1'].fill = _solid('FF0000')
+        ws['A2'] = 'Merged'
+        ws.merge_cells('A2:F2')
+        wb.save(xlsx_path)
+        
+        converter = XlsxConverter()
+        colors = converter.convert_to_csv(str(xlsx_path), 'Sheet', include_colors=True)
+        assert colors.splitlines()[0] == 'Value,,,{#FF0000}'
+        
+        merges = converter.convert_to_csv(str(xlsx_path), 'Sheet', signal_merge=True).splitlines()
+        assert merges[0] == 'Value,,,,,'
+        assert merges[1].count('{MG:') == 6
+    
+    def test_max_rows_columns(self, tmp_path, default_converter):
         """Test max rows and columns limits."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create test file with many rows and columns
-            xlsx_path = Path(temp_dir) / "test_limits.xlsx"
-            wb = Workbook()
-            ws = wb.active
-            
-            # Create 10x10 grid
-            for row in range(1, 11):
-                for col in range(1, 11):
-                    ws.cell(row=row, column=col, value=f"R{row}C{col}")
-            
-            wb.save(xlsx_path)
-            
-            # Convert with limits
-            converter = XlsxConverter()
-            result = converter.convert_to_csv(
-                str(xlsx_path),
-                'Sheet',
-                max_rows=3,
-                max_columns=4
+        # Create test file with many rows and columns
+        xlsx_path = tmp_path / "test_limits.xlsx"
+        wb, ws = _make_wb()
+        
+        # Create 10x10 grid
+        for row in range(1, 11):
+            ws.append([f"R{row}C{col}" for col in range(1, 11)])
+        
+        wb.save(xlsx_path)
+        
+        # Convert with limits
+        result = default_converter.convert_to_csv(
+            str(xlsx_path),
+            'Sheet',
+            max_rows=3,
+            max_columns=4
+        )
+        
+        # Parse result
+        lines = result.splitlines()
+        # Should have only 3 rows
+        assert len(lines) == 3
+        
+        # Each row should have only 4 columns
+        for line in lines:
+            cells = line.split(',')
+            assert len(cells) == 4
+    
+    def test_text_csv_quoting(self, tmp_path):
+        """Test that formatted output quotes cells like pandas' CSV writer does."""
+        xlsx_path = tmp_path / "test_quoting.xlsx"
+        wb = Workbook()
+        ws = wb.active
+        ws.append(['a,b', 'say "hi"', 'two\nlines', None, 'plain'])
+        wb.save(xlsx_path)
+        
+        converter = XlsxConverter()
+        df = converter._read_excel_with_formatting(str(xlsx_path), 'Sheet', include_bg_colors=True)
+        expected = df.to_csv(index=False, header=False)
+        
+        result = converter.convert_to_csv(str(xlsx_path), 'Sheet', include_bg_colors=True)
+        assert result == expected
+        assert result.startswith('"a,b","say ""hi""","two\nlines",,plain')
+        
+        buffer = io.StringIO()
+        converter.convert_to_file(str(xlsx_path), 'Sheet', buffer, include_bg_colors=True)
+        assert buffer.getvalue() == expected
+    
+    def test_convert_to_csv_iter(self, tmp_path, monkeypatch):
+        """Test that streamed output matches convert_to_csv."""
+        xlsx_path = tmp_path / "test.xlsx"
+        create_test_excel(xlsx_path, with_colors=True)
+        
+        # Force one row per chunk so the header is only written once
+        monkeypatch.setattr('flagged_csv.converter.CSV_CHUNK_ROWS', 1)
+        converter = XlsxConverter(XlsxConverterConfig(header=True))
+        
+        chunks = list(converter.convert_to_csv_iter(str(xlsx_path), 'TestSheet', include_colors=True))
+        
+        assert len(chunks) == 2
+        assert chunks[0].startswith('A,B,C\n')
+        assert ''.join(chunks) == converter.convert_to_csv(str(xlsx_path), 'TestSheet', include_colors=True)
+    
+    def test_convert_to_file(self, tmp_path):
+        """Test that output written to a stream matches convert_to_csv."""
+        xlsx_path = tmp_path / "test.xlsx"
+        create_test_excel(xlsx_path, with_colors=True)
+        
+        converter = XlsxConverter(XlsxConverterConfig(header=True))
+        for output_format in ('csv', 'markdown'):
+            stream = io.StringIO()
+            converter.convert_to_file(str(xlsx_path), 'TestSheet', stream, output_format, include_colors=True)
+            assert stream.getvalue() == converter.convert_to_csv(
+                str(xlsx_path), 'TestSheet', output_format, include_colors=True
             )
-            
-            # Parse result
-            lines = result.strip().split('\n')
-            # Should have only 3 rows
-            assert len(lines) == 3
-            
-            # Each row should have only 4 columns
-            for line in lines:
-                cells = line.split(',')
-                assert len(cells) == 4
+    
+    def test_convert_loaded_workbook(self, tmp_path):
+        """Test that a workbook loaded once converts like its file, sheet after sheet."""
+        xlsx_path = tmp_path / "test.xlsx"
+        create_test_excel(xlsx_path, with_colors=True, with_merge=True)
+        
+        converter = XlsxConverter()
+        wb = load_workbook(xlsx_path, read_only=True, data_only=True)
+        try:
+            for options in ({}, {'include_colors': True, 'preserve_formats': True}):
+                expected = converter.convert_to_csv(str(xlsx_path), 'TestSheet', **options)
+                assert converter.convert_to_csv(wb, 'TestSheet', **options) == expected
+            
+            with pytest.raises(ValueError, match="not found"):
+                converter.convert_to_csv(wb, 'Missing')
+        finally:
+            wb.close()
+    
+    def test_convert_in_memory_contents(self, tmp_path):
+        """Test that a workbook's bytes or a binary stream convert like its file."""
+        xlsx_path = tmp_path / "test.xlsx"
+        create_test_excel(xlsx_path, with_colors=True, with_merge=True)
+        data = xlsx_path.read_bytes()
+        
+        # Fresh converters, so merge IDs are numbered alike
+        for options in ({}, {'include_colors': True, 'signal_merge': True, 'preserve_formats': True}):
+            expected = XlsxConverter().convert_to_csv(str(xlsx_path), 'TestSheet', **options)
+            assert XlsxConverter().convert_to_csv(data, 'TestSheet', **options) == expected
+            assert XlsxConverter().convert_to_csv(io.BytesIO(data), 'TestSheet', **options) == expected
+        
+        with pytest.raises(ValueError, match="not found"):
+            XlsxConverter().convert_to_csv(data, 'Missing')
+    
+    def test_convert_to_csv_iter_raises_eagerly(self):
+        """Test that errors surface when the iterator is created, not consumed."""
+        converter = XlsxConverter()
+        with pytest.raises(FileNotFoundError):
+            converter.convert_to_csv_iter('/nonexistent/file.xlsx', 'Sheet1')
+    
+    def test_sheet_cache(self, tmp_path, monkeypatch):
+        """Test that cached sheets are reused until the workbook changes."""
+        xlsx_path = tmp_path / "test.xlsx"
+        create_test_excel(xlsx_path, with_colors=True)
+        
+        converter = XlsxConverter(XlsxConverterConfig(cache_dir=str(tmp_path / "cache")))
+        first = converter.convert_to_csv(str(xlsx_path), 'TestSheet', include_colors=True)
+        
+        # A cache hit must not open the workbook again
+        def fail_load(*args, **kwargs):
+            raise AssertionError("workbook was re-parsed")
+        
+        monkeypatch.setattr('flagged_csv.converter.load_workbook', fail_load)
+        monkeypatch.setattr('flagged_csv._xlsx_fast.open_workbook', fail_load)
+        assert converter.convert_to_csv(str(xlsx_path), 'TestSheet', include_colors=True) == first
+        
+        # Rewriting the file invalidates the entry
+        monkeypatch.undo()
+        wb = load_workbook(xlsx_path)
+        wb['TestSheet']['A2'] = 'Changed'
+        wb.save(xlsx_path)
+        assert 'Changed' in converter.convert_to_csv(str(xlsx_path), 'TestSheet', include_colors=True)
+    
+    def test_sheet_cache_pruned(self, tmp_path, monkeypatch):
+        """Test that the on-disk cache keeps only its newest entries."""
+        from flagged_csv import _wbcache
+        
+        monkeypatch.setattr(_wbcache, 'MAX_ENTRIES', 2)
+        cache_dir = tmp_path / "cache"
+        for age, key in enumerate(('first', 'second', 'third'), 1):
+            _wbcache.store(str(cache_dir), key, key)
+            # Distinct mtimes, so the order doesn't depend on timestamp resolution
+            os.utime(cache_dir / f"{key}.pkl", ns=(0, age * 10**9))
+        
+        assert sorted(path.stem for path in cache_dir.glob('*.pkl')) == ['second', 'third']
+        assert _wbcache.load(str(cache_dir), 'third') == 'third'
+    
+    def test_parsed_sheet_reused(self, tmp_path, monkeypatch):
+        """Test that conversions differing only in flags share one parse of the sheet."""
+        xlsx_path = tmp_path / "test.xlsx"
+        create_test_excel(xlsx_path, with_colors=True, with_merge=True)
+        
+        converter = XlsxConverter()
+        full = converter.convert_to_csv(str(xlsx_path), 'TestSheet', include_colors=True, preserve_formats=True)
+        
+        def fail_load(*args, **kwargs):
+            raise AssertionError("workbook was re-parsed")
+        
+        monkeypatch.setattr('flagged_csv._xlsx_fast.open_workbook', fail_load)
+        formats = converter.convert_to_csv(str(xlsx_path), 'TestSheet', preserve_formats=True, add_location=True)
+        assert converter.convert_to_csv(str(xlsx_path), 'TestSheet', include_bg_colors=True, preserve_formats=True)
+        # Merged ranges are always part of the parsed sheet
+        assert '{MG:' in converter.convert_to_csv(str(xlsx_path), 'TestSheet', signal_merge=True)
+        assert converter.convert_to_csv(str(xlsx_path), 'TestSheet', include_colors=True, preserve_formats=True) == full
+        
+        monkeypatch.undo()
+        assert formats == XlsxConverter().convert_to_csv(str(xlsx_path), 'TestSheet', preserve_formats=True, add_location=True)
+        
+        # A rewritten file is parsed again
+        wb = load_workbook(xlsx_path)
+        wb['TestSheet']['A2'] = 'Changed'
+        wb.save(xlsx_path)
+        stat = os.stat(xlsx_path)
+        os.utime(xlsx_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert 'Changed' in converter.convert_to_csv(str(xlsx_path), 'TestSheet', include_colors=True)
+    
+    def test_style_cache(self, tmp_path):
+        """Test that resolved styles are reused across conversions until the workbook changes."""
+        xlsx_path = tmp_path / "test_styles.xlsx"
+        wb = Workbook()
+        wb.active['A1'] = 'Cell'
+        wb.active['A1'].fill = _solid('FF0000')
+        wb.save(xlsx_path)
+        
+        converter = XlsxConverter()
+        assert converter.convert_to_csv(str(xlsx_path), 'Sheet', include_colors=True).startswith('Cell{#FF0000}')
+        assert len(converter._style_cache) == 1
+        assert converter.convert_to_csv(str(xlsx_path), 'Sheet', include_colors=True).startswith('Cell{#FF0000}')
+        assert len(converter._style_cache) == 1
+        
+        # Same size, newer mtime: the cached styles must not be reused
+        wb.active['A1'].fill = _solid('00FF00')
+        wb.save(xlsx_path)
+        stat = os.stat(xlsx_path)
+        os.utime(xlsx_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert converter.convert_to_csv(str(xlsx_path), 'Sheet', include_colors=True).startswith('Cell{#00FF00}')
+    
+    def test_shared_strings_reused(self, tmp_path, monkeypatch):
+        """Test that an unchanged workbook's shared strings are parsed only once."""
+        from openpyxl.reader import excel
+        
+        xlsx_path = tmp_path / "test.xlsx"
+        create_test_excel(xlsx_path, with_colors=True)
+        
+        reads = []
+        original_read_strings = excel.ExcelReader.read_strings
+        
+        def counting_read_strings(reader):
+            reads.append(reader)
+            original_read_strings(reader)
+        
+        monkeypatch.setattr(excel.ExcelReader, 'read_strings', counting_read_strings)
+        converter = XlsxConverter()
+        results = [converter.convert_to_csv(str(xlsx_path), 'TestSheet', include_colors=True) for _ in range(2)]
+        assert results[0] == results[1]
+        assert 'Header1' in results[0]
+        assert len(reads) == 1
+    
+    def test_read_only_matches_full_load(self, tmp_path):
+        """Test that read-only mode produces the same flags as a full workbook load."""
+        xlsx_path = tmp_path / "test_read_only.xlsx"
+        wb = Workbook()
+        ws = wb.active
+        ws['A1'] = 'Merged'
+        ws['A1'].fill = _solid('FF0000')
+        # Covered cells keep their own fill in the XML, but it must not be flagged
+        ws['B1'].fill = _solid('FF0000')
+        ws.merge_cells('A1:B1')
+        ws['A2'] = 'Below'
+        wb.save(xlsx_path)
+        
+        results = []
+        for read_only in (True, False):
+            converter = XlsxConverter(XlsxConverterConfig(read_only=read_only))
+            result = converter.convert_to_csv(str(xlsx_path), 'Sheet', include_colors=True, signal_merge=True)
+            results.append(re.sub(r'MG:\d{6}', 'MG:X', result))
+        
+        assert results[0] == results[1]
+        assert results[0].splitlines()[0] == 'Merged{#FF0000}{MG:X},{MG:X}'
+    
+    def test_calamine_engine_matches_openpyxl(self, tmp_path, monkeypatch):
+        """Test that the calamine and openpyxl engines read plain values identically."""
+        xlsx_path = tmp_path / "test_engine.xlsx"
+        wb = Workbook()
+        ws = wb.active
+        ws['A1'] = 'Text'
+        ws['B1'] = 42
+        ws['C1'] = 2.5
+        ws['D1'] = True
+        # openpyxl writes whitespace-only text without xml:space="preserve",
+        # which calamine would read as empty
+        ws['E1'] = ' '
+        ws['F1'] = 'End'
+        ws['A2'] = datetime(2024, 1, 15, 9, 30)
+        ws['B2'] = '   '
+        ws['C4'] = 'Last'
+        wb.save(xlsx_path)
+        
+        results = []
+        for engine in ('calamine', 'openpyxl'):
+            converter = XlsxConverter(XlsxConverterConfig(engine=engine))
+            results.append(converter.convert_to_csv(str(xlsx_path), 'Sheet'))
+        
+        assert results[0] == results[1]
+        assert results[0].splitlines()[0] == 'Text,42,2.5,True, ,End'
+        
+        # The check for such text streams the sheet XML; matches split across chunks still count
+        monkeypatch.setattr('flagged_csv._xlsx_fast._SCAN_CHUNK_SIZE', 7)
+        assert XlsxConverter().convert_to_csv(str(xlsx_path), 'Sheet') == results[1]
+        
+        with pytest.raises(ValueError, match="not found"):
+            XlsxConverter().convert_to_csv(str(xlsx_path), 'Missing')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,65 @@
+"""
+Tests for the flagged CSV parsing helpers.
+"""
+
+import pytest
+
+from flagged_csv import FLAG_RE, parse_cell, scan_flags, strip_flags
+
+
+class TestParseCell:
+    """Test splitting flagged cells into values and flags."""
+    
+    def test_all_flags(self):
+        """Test a cell carrying color, merge and location flags."""
+        value, color, merge_id = parse_cell('$500{#FF0000}{fc:#FFFFFF}{MG:123456}{l:B5}')
+        
+        assert value == '$500'
+        assert color == '#FF0000'
+        assert merge_id == '123456'
+    
+    def test_explicit_bg_syntax(self):
+        """Test the {bc:#RRGGBB} background syntax."""
+        assert parse_cell('Sales{bc:#00FF00}') == ('Sales', '#00FF00', None)
+    
+    def test_plain_cell(self):
+        """Test a cell without any flags."""
+        assert parse_cell('Q4 Total') == ('Q4 Total', None, None)
+        assert parse_cell('') == ('', None, None)
+    
+    def test_flags_only(self):
+        """Test a cell that is only flags (e.g. the tail of a merged range)."""
+        assert parse_cell('{MG:789012}') == ('', None, '789012')
+
+
+
+class TestStripFlags:
+    """Test removing flags from cells."""
+    
+    @pytest.mark.parametrize("cell, expected", [
+        ('$500{#FF0000}{fc:#FFFFFF}{MG:123456}{l:B5}', '$500'),
+        ('{MG:123456}', ''),
+        ('Q4 Total', 'Q4 Total'),
+        ('empty {} braces', 'empty {} braces'),
+        ('unclosed {brace', 'unclosed {brace'),
+    ])
+    def test_strip_flags(self, cell, expected):
+        """Test that strip_flags matches a FLAG_RE substitution."""
+        assert strip_flags(cell) == expected
+        assert strip_flags(cell) == FLAG_RE.sub('', cell)
+
+
+class TestScanFlags:
+    """Test whole-document flag scanning."""
+    
+    def test_offsets(self):
+        """Test that color and merge flags are reported with their offsets."""
+        text = "a{#FF0000}{MG:123456},b{l:A1}\n{MG:123456}"
+        flags = scan_flags(text)
+        
+        assert [kind for kind, _, _ in flags] == ['color', 'merge', 'merge']
+        assert [text[start:end] for _, start, end in flags] == ['{#FF0000}', '{MG:123456}', '{MG:123456}']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])